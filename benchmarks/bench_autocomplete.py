@@ -0,0 +1,53 @@
+"""Measure per-keystroke autocomplete latency against a linear scan.
+
+Run from the repository root:  python benchmarks/bench_autocomplete.py [name_count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog_gen import BRANDS, MODELS  # noqa: E402
+from shopease.autocomplete import Autocomplete  # noqa: E402
+
+QUERY = "Nike Air 1234"
+
+
+def generate_names(count: int, seed: int = 42):
+    """Product names as shops list them: the same name is often carried by several shops."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(BRANDS)} {rng.choice(MODELS)} {rng.randint(0, count // 4)}" for _ in range(count)]
+
+
+def main():
+    name_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    names = generate_names(name_count)
+    start = time.perf_counter()
+    engine = Autocomplete(names)
+    print(f"{name_count} names ({len(engine)} distinct), built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for by_popularity in (False, True):
+        print("Popularity order:" if by_popularity else "Alphabetical order:")
+        for length in range(1, len(QUERY) + 1):
+            prefix = QUERY[:length]
+            start = time.perf_counter()
+            completions = engine.complete(prefix, 10, by_popularity)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"  {prefix!r:<18} {elapsed:8.3f} ms  {completions[:2]}")
+
+    start = time.perf_counter()
+    engine.add("Nike Air 1234 Limited")
+    engine.remove("Nike Air 1234 Limited")
+    print(f"Add and remove one name: {(time.perf_counter() - start) * 1000:.3f} ms")
+
+    distinct = list(engine.counts)
+    start = time.perf_counter()
+    prefix = QUERY[:4].lower()
+    sorted(name for name in distinct if name.lower().startswith(prefix))[:10]
+    print(f"Linear scan for {QUERY[:4]!r}: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
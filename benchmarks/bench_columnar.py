@@ -0,0 +1,93 @@
+"""Compare the NumPy columnar engine with dict scans for filters, sorts and aggregates.
+
+Run from the repository root:  python benchmarks/bench_columnar.py [product_count ...]
+(default 10000 100000 1000000; needs numpy)
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog_gen import generate_catalog  # noqa: E402
+from shopease import columnar  # noqa: E402
+from shopease.columnar import ColumnarCatalog  # noqa: E402
+
+
+def scan_filter(shops, max_price, limit=None):
+    """In-stock products up to max_price, cheapest first, the way a dict scan finds them."""
+    matches = [
+        (data["Price"], shop_name, product_name)
+        for shop_name, shop_data in shops.items()
+        for product_name, data in shop_data["Products"].items()
+        if data["Price"] <= max_price and data["stock"] > 0
+    ]
+    matches.sort(key=lambda match: match[0])
+    return [(shop_name, product_name) for _, shop_name, product_name in matches[:limit]]
+
+
+def column_filter(catalog, max_price, limit=None):
+    return catalog.keys_of(catalog.sort_by_price(catalog.select(max_price=max_price, in_stock=True), limit=limit))
+
+
+def scan_categories(shops, categories, sizes):
+    return [
+        (shop_name, product_name)
+        for shop_name, shop_data in shops.items()
+        for product_name, data in shop_data["Products"].items()
+        if data["Category"] in categories and any(size in sizes for size in data["Sizes"])
+    ]
+
+
+def scan_brands(shops):
+    return Counter(product_name for shop_data in shops.values() for product_name in shop_data["Products"])
+
+
+def timed(func, *args, repeat=5):
+    """Best time of repeat runs in ms, and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def run(product_count):
+    shops = generate_catalog(product_count)
+    products = [((shop_name, product_name), data)
+                for shop_name, shop_data in shops.items() for product_name, data in shop_data["Products"].items()]
+    build_ms, catalog = timed(ColumnarCatalog.build, products, repeat=1)
+    print(f"{product_count} products, columns built in {build_ms:.0f} ms")
+
+    cases = [
+        ("in stock <= 2000, all", scan_filter, (shops, 2000), column_filter, (catalog, 2000)),
+        ("in stock <= 2000, top 50", scan_filter, (shops, 2000, 50), column_filter, (catalog, 2000, 50)),
+        ("Boots/Sports in size 9-10", scan_categories, (shops, {"Boots", "Sports"}, {9, 10}),
+         lambda *args: catalog.keys_of(catalog.select(categories=args[0], sizes=args[1])),
+         (["Boots", "Sports"], [9, 10])),
+        ("shops per brand", scan_brands, (shops,), ColumnarCatalog.brand_counts, (catalog,)),
+    ]
+    for label, scan, scan_args, vectorized, vectorized_args in cases:
+        scan_ms, expected = timed(scan, *scan_args)
+        column_ms, result = timed(vectorized, *vectorized_args)
+        same = sorted(expected) == sorted(result) if isinstance(expected, list) else dict(expected) == result
+        print(f"  {label:<28} dict scan {scan_ms:9.1f} ms   columns {column_ms:9.1f} ms   "
+              f"{scan_ms / column_ms:6.1f}x   {'same' if same else 'DIFFERENT'} results")
+
+    key, data = products[0]
+    update_ms, _ = timed(catalog.add, key, dict(data, stock=0), repeat=100)
+    print(f"  {'single product update':<28} {update_ms * 1000:.1f} us")
+
+
+def main():
+    if not columnar.available():
+        print("numpy is not installed; pip install numpy (or ShopEase[columnar]) to run this benchmark")
+        return
+    for product_count in [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]:
+        run(product_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Measure catalog export throughput for each output format and worker count.
+
+Run from the repository root:  python benchmarks/bench_export.py [product_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog_gen import generate_catalog  # noqa: E402
+from shopease.catalog import compact_shops  # noqa: E402
+from shopease.export import export_catalog  # noqa: E402
+
+
+def main():
+    product_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    shops = compact_shops(generate_catalog(product_count))
+    print(f"Catalog: {len(shops)} shops, {product_count} products ({os.cpu_count()} CPUs)")
+    with tempfile.TemporaryDirectory() as directory:
+        for filename in ("catalog.csv", "catalog.jsonl", "catalog.csv.gz", "catalog.jsonl.gz"):
+            path = os.path.join(directory, filename)
+            for workers in (1, 4):
+                start = time.perf_counter()
+                rows = export_catalog(shops, path, workers=workers)
+                elapsed = time.perf_counter() - start
+                print(f"  {filename:<18} {workers} worker(s) {elapsed * 1000:10.1f} ms "
+                      f"{rows / elapsed:12.0f} rows/s {os.path.getsize(path) / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare trigram-indexed fuzzy name search with a brute-force Levenshtein scan.
+
+Run from the repository root:  python benchmarks/bench_fuzzy.py [name_count] [query_count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_autocomplete import generate_names  # noqa: E402
+from shopease.fuzzy import TrigramIndex, default_max_distance, levenshtein  # noqa: E402
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Apply one random deletion, insertion or substitution to name."""
+    position = rng.randrange(len(name))
+    edit = rng.choice(("delete", "insert", "substitute"))
+    if edit == "delete":
+        return name[:position] + name[position + 1:]
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    if edit == "insert":
+        return name[:position] + letter + name[position:]
+    return name[:position] + letter + name[position + 1:]
+
+
+def brute_force(names, query: str, limit: int = 10):
+    query = query.lower()
+    max_distance = default_max_distance(query)
+    matches = []
+    for name in names:
+        distance = levenshtein(query, name.lower(), max_distance)
+        if distance <= max_distance:
+            matches.append((distance, name))
+    matches.sort()
+    return [(name, distance) for distance, name in matches[:limit]]
+
+
+def main():
+    name_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    names = sorted(set(generate_names(name_count)))
+    rng = random.Random(7)
+    queries = [misspell(rng.choice(names), rng) for _ in range(query_count)]
+
+    start = time.perf_counter()
+    index = TrigramIndex(names)
+    print(f"{len(names)} distinct names, trigram index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    indexed = [index.search(query) for query in queries]
+    indexed_ms = (time.perf_counter() - start) * 1000 / query_count
+    start = time.perf_counter()
+    scanned = [brute_force(names, query) for query in queries]
+    scanned_ms = (time.perf_counter() - start) * 1000 / query_count
+
+    agree = sum(
+        [distance for _, distance in a] == [distance for _, distance in b] for a, b in zip(indexed, scanned)
+    )
+    print(f"Trigram index:     {indexed_ms:10.2f} ms per query")
+    print(f"Levenshtein scan:  {scanned_ms:10.2f} ms per query")
+    print(f"Same ranking for {agree}/{query_count} queries, e.g. {queries[0]!r} -> {indexed[0][:3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Report the memory held by the plain-dict and compact catalog layouts.
+
+Run from the repository root:  python benchmarks/bench_memory.py [product_count]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog_gen import generate_catalog  # noqa: E402
+from shopease.catalog import memory_report  # noqa: E402
+
+
+def main():
+    product_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    report = memory_report(generate_catalog(product_count))
+    print(f"Products:        {report['products']}")
+    print(f"Plain dicts:     {report['plain_bytes'] / 2**20:8.1f} MiB")
+    print(f"Compact records: {report['compact_bytes'] / 2**20:8.1f} MiB")
+    print(f"Saved:           {report['saved_bytes'] / 2**20:8.1f} MiB "
+          f"({report['saved_bytes'] / report['plain_bytes']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Time screen navigation in the Tk UI with the screen cache off (rebuild on every visit) and on.
+
+Run from the repository root with a display:  python benchmarks/bench_navigation.py [product_count] [rounds]
+The DataHandler works in a temporary directory, so the generated catalog never
+reaches the real shops.json, parse cache or snapshot.
+"""
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog_gen import generate_catalog  # noqa: E402
+from shopease.config import SCREEN_CACHE_SIZE  # noqa: E402
+from shopease.data import DataHandler  # noqa: E402
+from shopease.ui import ShopEaseUI  # noqa: E402
+
+# A user browsing: back to the panel between each search screen
+ROUTE = ["user_panel", "search_product_window", "user_panel", "search_by_price_window", "user_panel",
+         "facet_search_window", "user_panel", "display_brands", "user_panel", "shop_details", "create_main_menu"]
+
+
+@contextmanager
+def scratch_directory():
+    """Run the block in a temporary working directory, where the handler's relative data files then live."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+
+
+def run(shops, capacity: int, rounds: int):
+    """Median navigation time in ms per screen, first visits excluded."""
+    timings = {}
+    with scratch_directory():
+        root = tk.Tk()
+        data_handler = DataHandler()
+        data_handler.shops = shops
+        data_handler.catalog.reset()
+        ui = ShopEaseUI(root, data_handler)
+        ui.screens.capacity = capacity
+        for round_number in range(rounds + 1):
+            for name in ROUTE:
+                start = time.perf_counter()
+                getattr(ui, name)()
+                # Include geometry management, which Tk otherwise defers to idle time
+                root.update_idletasks()
+                if round_number:
+                    timings.setdefault(name, []).append(time.perf_counter() - start)
+        root.destroy()
+        # Let queued saves and the parse cache land in the scratch directory before it is removed
+        data_handler.close()
+    return {name: sorted(samples)[len(samples) // 2] * 1000 for name, samples in timings.items()}
+
+
+def main():
+    product_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    shops = generate_catalog(product_count)
+    rebuilt = run(shops, 0, rounds)
+    cached = run(shops, SCREEN_CACHE_SIZE, rounds)
+    print(f"{product_count} products, median of {rounds} visits per screen")
+    print(f"  {'screen':<24} {'rebuilt':>10} {'cached':>10}")
+    for name in rebuilt:
+        print(f"  {name:<24} {rebuilt[name]:8.2f} ms {cached[name]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
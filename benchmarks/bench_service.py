@@ -0,0 +1,89 @@
+"""Load-test the catalog service headlessly with a mix of the searches the front ends run.
+
+Run from the repository root:  python benchmarks/bench_service.py [product_count] [request_count] [--profile]
+"""
+import cProfile
+import os
+import pstats
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog_gen import BRANDS, CATEGORIES, MODELS, generate_catalog  # noqa: E402
+from shopease.service import CatalogService  # noqa: E402
+
+
+def workload(shops, request_count: int, seed: int = 7):
+    """(operation, callable) pairs drawn from a small pool of popular queries, so some repeat."""
+    rng = random.Random(seed)
+    shop_names = list(shops)
+    popular = [f"{brand} {model}".lower() for brand in BRANDS for model in MODELS[:3]]
+    requests = []
+    for _ in range(request_count):
+        kind = rng.choice(("complete", "search", "price", "query", "facets", "shop", "fuzzy"))
+        if kind == "complete":
+            text = rng.choice(popular)[:rng.randint(1, 6)]
+            requests.append((kind, lambda service, text=text: service.complete_products(text)))
+        elif kind == "search":
+            text = rng.choice(popular)
+            requests.append((kind, lambda service, text=text: service.search_products(text)))
+        elif kind == "price":
+            max_price = rng.choice((1000, 2000, 5000))
+            requests.append((kind, lambda service, max_price=max_price: service.find_by_price(
+                max_price=max_price, limit=50, in_stock=True)))
+        elif kind == "query":
+            text = f"{rng.choice(BRANDS).lower()} size:{rng.randint(5, 10)} price<{rng.choice((1500, 3000))}"
+            requests.append((kind, lambda service, text=text: service.run_query(text)))
+        elif kind == "facets":
+            category = rng.choice(CATEGORIES)
+            requests.append((kind, lambda service, category=category: service.facet_search(
+                categories=[category], sizes=[8, 9], in_stock=True)))
+        elif kind == "shop":
+            shop_name = rng.choice(shop_names)
+            requests.append((kind, lambda service, shop_name=shop_name: service.shop_details(shop_name)))
+        else:
+            text = rng.choice(popular)
+            text = text[:-2] + text[-1]
+            requests.append((kind, lambda service, text=text: service.fuzzy_product_names(text)))
+    return requests
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    product_count = int(args[0]) if args else 100_000
+    request_count = int(args[1]) if len(args) > 1 else 2000
+    shops = generate_catalog(product_count)
+    service = CatalogService(lambda: shops)
+
+    start = time.perf_counter()
+    service.search_index
+    print(f"{product_count} products, indexes built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    requests = workload(shops, request_count)
+    profiler = cProfile.Profile() if "--profile" in sys.argv else None
+    timings = {}
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    for kind, request in requests:
+        began = time.perf_counter()
+        request(service)
+        timings.setdefault(kind, []).append(time.perf_counter() - began)
+    if profiler:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    print(f"{request_count} requests in {elapsed:.2f} s ({request_count / elapsed:.0f} requests/s)")
+    for kind, samples in sorted(timings.items()):
+        samples.sort()
+        print(f"  {kind:<10} {len(samples):6d} calls   median {samples[len(samples) // 2] * 1000:8.2f} ms   "
+              f"p95 {samples[int(len(samples) * 0.95)] * 1000:8.2f} ms")
+    print(f"Query cache: {service.query_cache.stats()}")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+
+if __name__ == "__main__":
+    main()
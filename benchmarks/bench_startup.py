@@ -0,0 +1,49 @@
+"""Compare catalog startup paths on a synthetic catalog.
+
+Run from the repository root:  python benchmarks/bench_startup.py [product_count]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog_gen import generate_catalog  # noqa: E402
+from shopease.catalog import compact_shops  # noqa: E402
+from shopease.snapshot import SnapshotShops, write_snapshot  # noqa: E402
+
+
+def timed(label: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"  {label:<36} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def load_json(path: str):
+    with open(path) as file:
+        return compact_shops(json.load(file))
+
+
+def main():
+    product_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    shops = generate_catalog(product_count)
+    print(f"Catalog: {len(shops)} shops, {product_count} products")
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "shops.json")
+        snapshot_path = os.path.join(directory, "shops.snap")
+        with open(json_path, "w") as file:
+            json.dump(shops, file, indent=4)
+        write_snapshot(snapshot_path, shops)
+
+        timed("json.load + compact records", load_json, json_path)
+        snapshot = timed("open memory-mapped snapshot", SnapshotShops, snapshot_path)
+        shop_names = timed("read shop table on first use", list, snapshot)
+        timed("first shop lookup", snapshot.__getitem__, shop_names[0])
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
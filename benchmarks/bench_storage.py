@@ -0,0 +1,64 @@
+"""Compare the JSON, SQLite and sharded storage backends on a synthetic catalog.
+
+Run from the repository root:  python benchmarks/bench_storage.py [product_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.catalog_gen import generate_catalog  # noqa: E402
+from shopease.service import CatalogService  # noqa: E402
+from shopease.storage import JsonBackend, ShardedBackend, SQLiteBackend  # noqa: E402
+
+
+def timed(label: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f"  {label:<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def run(backend, shops):
+    timed("save full catalog", backend.save_shops, shops)
+    loaded = timed("load catalog", backend.load_shops)
+    shop_name = next(iter(loaded))
+    product_name = next(iter(loaded[shop_name]["Products"]))
+    loaded[shop_name]["Products"][product_name]["stock"] += 1
+    timed("single stock update", backend.record, loaded,
+          {"op": "patch", "shop": shop_name, "product": product_name,
+           "data": {"stock": loaded[shop_name]["Products"][product_name]["stock"]}})
+    if hasattr(backend, "find_products"):
+        search = backend.find_products
+    else:
+        # Without indexes of its own, the backend's catalog is searched through CatalogService's
+        catalog = CatalogService(lambda: loaded)
+        timed("build search indexes", lambda: catalog.search_index)
+        search = catalog.find_products
+    matches = timed("search by name", search, name=product_name)
+    assert matches and matches[0][1] == product_name
+    cheap = timed("search price <= 500", search, max_price=500)
+    print(f"  ({len(cheap)} products under 500)")
+    backend.close()
+
+
+def main():
+    product_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    shops = generate_catalog(product_count)
+    print(f"Catalog: {len(shops)} shops, {product_count} products")
+    with tempfile.TemporaryDirectory() as directory:
+        print("JSON backend (journaled):")
+        run(JsonBackend(os.path.join(directory, "shops.json"), os.path.join(directory, "admin.json"),
+                        os.path.join(directory, "users.json"), os.path.join(directory, "shops.journal")), shops)
+        print("SQLite backend:")
+        run(SQLiteBackend(os.path.join(directory, "shopease.db")), shops)
+        print("Sharded backend:")
+        run(ShardedBackend(os.path.join(directory, "shops.d"),
+                           admin_file=os.path.join(directory, "admin.json"),
+                           users_file=os.path.join(directory, "users.json")), shops)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Synthetic catalogs in the shops.json layout, shared by the benchmark scripts."""
+import random
+from typing import Dict
+
+BRANDS = ["Nike", "Adidas", "Puma", "Reebok", "Converse", "Vans", "Skechers", "New Balance",
+          "Woodland", "Bata", "Asics", "Fila", "Crocs", "Sparx", "Campus", "Liberty"]
+MODELS = ["Air", "Runner", "Classic", "Court", "Trail", "Flex", "Street", "Pro", "Lite", "Max"]
+CATEGORIES = ["Sneakers", "Formal", "Sandals", "Boots", "Sports", "Casual"]
+
+
+def generate_catalog(product_count: int, products_per_shop: int = 100, seed: int = 42) -> Dict:
+    """Build a shops dict with product_count products spread over shops of products_per_shop."""
+    rng = random.Random(seed)
+    shops = {}
+    shop_count = max(1, product_count // products_per_shop)
+    for shop_index in range(shop_count):
+        products = {}
+        for product_index in range(products_per_shop):
+            name = f"{rng.choice(BRANDS)} {rng.choice(MODELS)} {shop_index * products_per_shop + product_index}"
+            low = rng.randint(3, 8)
+            products[name] = {
+                "stock": rng.randint(0, 50),
+                "Price": rng.randint(300, 9000),
+                "Sizes": list(range(low, low + rng.randint(1, 5))),
+                "Category": rng.choice(CATEGORIES),
+            }
+        shops[f"Shop {shop_index}"] = {"Location": f"Street {shop_index}, Thrissur, Kerala", "Products": products}
+    return shops
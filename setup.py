@@ -7,6 +7,10 @@ setup(
     install_requires=[
         "pyinstaller",
     ],
+    extras_require={
+        # Vectorized filters and aggregates over the catalog (see shopease/columnar.py)
+        "columnar": ["numpy"],
+    },
     package_data={
         "shopease": ["assets/*"],
     },
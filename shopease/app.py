@@ -1,12 +1,31 @@
-import tkinter as tk
-from .data import DataHandler
-from .ui import ShopEaseUI
+import sys
+from .startup import StartupProfile
 
 def main():
-    root = tk.Tk()
-    data_handler = DataHandler()
-    app = ShopEaseUI(root, data_handler)
-    root.mainloop()
+    """Start the ShopEase window; with --profile-startup, print a startup breakdown and quit once ready."""
+    # The heavier modules are imported here rather than at the top so that their cost is measured
+    profile = StartupProfile(verbose="--profile-startup" in sys.argv[1:])
+    with profile.step("import tkinter"):
+        import tkinter as tk
+    with profile.step("import shopease.data"):
+        from .data import DataHandler
+    with profile.step("import shopease.ui"):
+        from .ui import ShopEaseUI
+    with profile.step("tk.Tk()"):
+        root = tk.Tk()
+    with profile.step("DataHandler()"):
+        # Loaded on a worker thread behind the splash screen, so the window appears at once
+        data_handler = DataHandler(load=False)
+    with profile.step("ShopEaseUI()"):
+        app = ShopEaseUI(root, data_handler, on_ready=lambda: profile.ready(root))
+    root.after_idle(profile.first_frame, root)
+    try:
+        root.mainloop()
+    finally:
+        app.screens.log_stats()
+        data_handler.close()
+    # A non-zero exit status lets a profiling run in CI fail when startup is over budget
+    return 1 if profile.verbose and profile.over_budget else None
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
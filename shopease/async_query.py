@@ -0,0 +1,70 @@
+import logging
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Optional
+
+
+class AsyncQuery:
+    """Runs compute(query) on a worker thread and hands the result to deliver(result) on the Tk thread.
+
+    submit() is debounced: a query only starts once delay_ms pass without a newer
+    submit. Every submit supersedes the previous one, so a superseded query that
+    has not started is cancelled, and the result of one that has is dropped.
+    Results are collected by polling with root.after, since Tk must only be
+    touched from its own thread.
+    """
+
+    def __init__(self, root, executor: Executor, compute: Callable[[Any], Any], deliver: Callable[[Any], None],
+                 delay_ms: int = 150, poll_ms: int = 20, alive: Optional[Callable[[], bool]] = None):
+        self.root = root
+        self.executor = executor
+        self.compute = compute
+        self.deliver = deliver
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        # Checked before delivering, e.g. the winfo_exists of the widget being filled
+        self.alive = alive or (lambda: True)
+        self.generation = 0
+        self.after_id: Optional[str] = None
+        self.future: Optional[Future] = None
+
+    def submit(self, query: Any):
+        self.cancel()
+        self.after_id = self.root.after(self.delay_ms, self._start, self.generation, query)
+
+    def cancel(self):
+        """Drop the pending or running query, if any."""
+        self.generation += 1
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+
+    def _start(self, generation: int, query: Any):
+        self.after_id = None
+        if generation != self.generation:
+            return
+        self.future = self.executor.submit(self._run, generation, query)
+        self.root.after(self.poll_ms, self._poll, generation, self.future)
+
+    def _run(self, generation: int, query: Any):
+        # Queries queued behind a slow one may be stale by the time the worker reaches them
+        if generation != self.generation:
+            return None
+        return self.compute(query)
+
+    def _poll(self, generation: int, future: Future):
+        if generation != self.generation or future.cancelled():
+            return
+        if not future.done():
+            self.root.after(self.poll_ms, self._poll, generation, future)
+            return
+        self.future = None
+        try:
+            result = future.result()
+        except Exception as e:
+            logging.error(f"Background query failed: {e}")
+            return
+        if self.alive():
+            self.deliver(result)
@@ -0,0 +1,95 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+# Sorts after every character, so prefix + END bounds the keys starting with prefix
+END = "\U0010ffff"
+
+
+class Autocomplete:
+    """Case-insensitive prefix completion over a multiset of names.
+
+    A name's popularity is how many times it has been added, e.g. the number of
+    shops that carry a product. Names are bucketed by popularity, and each bucket
+    is a sorted array of lower-cased keys with a parallel array of the original
+    names, so the completions of a prefix in a bucket are found with two bisects.
+    The most popular completions are read bucket by bucket from the top, and the
+    alphabetical ones by merging the first few completions of every bucket, so a
+    lookup costs O(buckets * log(names)) however many names share the prefix.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.counts: Dict[str, int] = Counter(names)
+        by_count: Dict[int, List[str]] = {}
+        for name, count in self.counts.items():
+            by_count.setdefault(count, []).append(name)
+        self.buckets: Dict[int, Tuple[List[str], List[str]]] = {}
+        for count, names in by_count.items():
+            names.sort(key=str.lower)
+            self.buckets[count] = ([name.lower() for name in names], names)
+        # Popularities that have a bucket, ascending
+        self.popularities: List[int] = sorted(self.buckets)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _insert(self, count: int, name: str):
+        bucket = self.buckets.get(count)
+        if bucket is None:
+            bucket = self.buckets[count] = ([], [])
+            insort(self.popularities, count)
+        keys, names = bucket
+        key = name.lower()
+        position = bisect_right(keys, key)
+        keys.insert(position, key)
+        names.insert(position, name)
+
+    def _remove(self, count: int, name: str):
+        keys, names = self.buckets[count]
+        key = name.lower()
+        position = names.index(name, bisect_left(keys, key), bisect_right(keys, key))
+        del keys[position]
+        del names[position]
+        if not names:
+            del self.buckets[count]
+            self.popularities.remove(count)
+
+    def add(self, name: str):
+        count = self.counts.get(name, 0)
+        if count:
+            self._remove(count, name)
+        self.counts[name] = count + 1
+        self._insert(count + 1, name)
+
+    def remove(self, name: str):
+        count = self.counts.get(name)
+        if count is None:
+            return
+        self._remove(count, name)
+        if count > 1:
+            self.counts[name] = count - 1
+            self._insert(count - 1, name)
+        else:
+            del self.counts[name]
+
+    def _completions(self, count: int, prefix: str, limit: int) -> List[str]:
+        """The first limit names in one popularity bucket that start with prefix."""
+        keys, names = self.buckets[count]
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + END, start, min(start + limit, len(keys)))
+        return names[start:end]
+
+    def complete(self, prefix: str, limit: int = 10, by_popularity: bool = False) -> List[str]:
+        """Return up to limit names starting with prefix, alphabetically or most popular first."""
+        prefix = prefix.lower()
+        if not by_popularity:
+            slices = [self._completions(count, prefix, limit) for count in self.popularities]
+            return list(islice(heapq.merge(*slices, key=str.lower), limit))
+        completions: List[str] = []
+        for count in reversed(self.popularities):
+            completions += self._completions(count, prefix, limit - len(completions))
+            if len(completions) >= limit:
+                break
+        return completions
@@ -0,0 +1,211 @@
+import json
+import sys
+import tracemalloc
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+# Sizes in this range are packed into a single int bitmask; anything else is kept as a tuple
+MAX_BITMASK_SIZE = 63
+
+PRODUCT_FIELDS = ("stock", "Price", "Sizes", "Category")
+
+
+def encode_sizes(sizes: Iterable) -> Union[int, tuple]:
+    """Pack a list of sizes into an int bitmask, falling back to a tuple."""
+    sizes = list(sizes)
+    if all(type(size) is int and 0 <= size <= MAX_BITMASK_SIZE for size in sizes):
+        mask = 0
+        for size in sizes:
+            mask |= 1 << size
+        return mask
+    return tuple(sizes)
+
+
+def decode_sizes(sizes: Union[int, tuple]) -> List:
+    """Unpack sizes stored by encode_sizes into a sorted list."""
+    if type(sizes) is tuple:
+        return list(sizes)
+    return [size for size in range(sizes.bit_length()) if sizes >> size & 1]
+
+
+class Product(MutableMapping):
+    """A product record that behaves like the {"stock", "Price", "Sizes", "Category"} dict.
+
+    Reading "Sizes" returns a fresh list, so sizes must be changed by assigning
+    the key rather than mutating the returned list in place.
+    """
+
+    __slots__ = ("stock", "price", "sizes", "category", "extra")
+
+    def __init__(self, stock: int = 0, price: float = 0, sizes: Iterable = (),
+                 category: Optional[str] = None, extra: Optional[Dict] = None):
+        self.stock = stock
+        self.price = price
+        self.sizes = encode_sizes(sizes)
+        self.category = sys.intern(category) if category is not None else None
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Product":
+        if isinstance(data, Product):
+            return data
+        extra = {key: value for key, value in data.items() if key not in PRODUCT_FIELDS}
+        return cls(data.get("stock", 0), data.get("Price", 0), data.get("Sizes", ()),
+                   data.get("Category"), extra)
+
+    def __getitem__(self, key: str):
+        if key == "stock":
+            return self.stock
+        if key == "Price":
+            return self.price
+        if key == "Sizes":
+            return decode_sizes(self.sizes)
+        if key == "Category" and self.category is not None:
+            return self.category
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key == "stock":
+            self.stock = value
+        elif key == "Price":
+            self.price = value
+        elif key == "Sizes":
+            self.sizes = encode_sizes(value)
+        elif key == "Category":
+            self.category = sys.intern(value) if value is not None else None
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key == "Category" and self.category is not None:
+            self.category = None
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "stock"
+        yield "Price"
+        yield "Sizes"
+        if self.category is not None:
+            yield "Category"
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return 3 + (self.category is not None) + len(self.extra or ())
+
+    def __repr__(self) -> str:
+        return f"Product({dict(self)!r})"
+
+    def copy(self) -> "Product":
+        product = Product.__new__(Product)
+        product.stock, product.price, product.sizes, product.category = self.stock, self.price, self.sizes, self.category
+        product.extra = dict(self.extra) if self.extra else None
+        return product
+
+
+class Shop(MutableMapping):
+    """A shop record that behaves like the {"Location", "Products"} dict."""
+
+    __slots__ = ("location", "products")
+
+    def __init__(self, location: str = "", products: Optional[Dict[str, Product]] = None):
+        self.location = location
+        self.products = products if products is not None else {}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Shop":
+        if isinstance(data, Shop):
+            return data
+        return cls(data.get("Location", ""), {
+            sys.intern(name): Product.from_dict(product) for name, product in data["Products"].items()
+        })
+
+    def __getitem__(self, key: str):
+        if key == "Location":
+            return self.location
+        if key == "Products":
+            return self.products
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key == "Location":
+            self.location = value
+        elif key == "Products":
+            self.products = {sys.intern(name): Product.from_dict(product) for name, product in value.items()}
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key: str):
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("Location", "Products"))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __repr__(self) -> str:
+        return f"Shop(location={self.location!r}, products={len(self.products)})"
+
+    def copy(self) -> "Shop":
+        """Copy the shop and its product records; names and sizes are immutable and shared."""
+        return Shop(self.location, {name: product.copy() for name, product in self.products.items()})
+
+
+def compact_shops(shops: Mapping) -> Dict[str, Shop]:
+    """Convert a shops.json-style dict into compact Shop and Product records."""
+    return {name: Shop.from_dict(data) for name, data in shops.items()}
+
+
+def copy_shops(shops: Mapping) -> Dict:
+    """Copy shops record by record, so that the copy can be written out while the original is edited."""
+    copied = {}
+    for shop_name, shop_data in shops.items():
+        if isinstance(shop_data, Shop):
+            copied[shop_name] = shop_data.copy()
+        else:
+            copied[shop_name] = {**shop_data, "Products": {
+                name: dict(product) for name, product in shop_data["Products"].items()
+            }}
+    return copied
+
+
+def to_plain(obj):
+    """json `default` hook that serializes Shop and Product records as plain dicts."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def memory_report(shops: Mapping) -> Dict[str, int]:
+    """Measure with tracemalloc how much memory the plain and compact layouts of shops retain."""
+    text = json.dumps(shops, default=to_plain)
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        plain = json.loads(text)
+        plain_bytes = tracemalloc.get_traced_memory()[0] - baseline
+        del plain
+
+        baseline = tracemalloc.get_traced_memory()[0]
+        compact = compact_shops(json.loads(text))
+        compact_bytes = tracemalloc.get_traced_memory()[0] - baseline
+        del compact
+    finally:
+        if started:
+            tracemalloc.stop()
+    return {
+        "products": sum(len(shop["Products"]) for shop in shops.values()),
+        "plain_bytes": plain_bytes,
+        "compact_bytes": compact_bytes,
+        "saved_bytes": plain_bytes - compact_bytes,
+    }
@@ -0,0 +1,194 @@
+import importlib.util
+from collections.abc import Mapping
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+# numpy is optional, and slow to import, so it is only imported once a ColumnarCatalog is made;
+# without it the dict and index paths are used
+np = None
+
+ProductKey = Tuple[str, str]
+
+# Distinct sizes the per-product size bitmask can tell apart
+MAX_SIZES = 64
+
+
+def available() -> bool:
+    """Whether numpy is installed, found without importing it."""
+    return np is not None or importlib.util.find_spec("numpy") is not None
+
+
+def _import_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+
+class Lookup:
+    """Ids for the distinct values of a column, assigned in order of first appearance."""
+
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self.ids: Dict[Hashable, int] = {}
+
+    def id(self, value: Hashable) -> int:
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+
+class ColumnarCatalog:
+    """The catalog mirrored into NumPy columns, one row per product, for vectorized filters and aggregates.
+
+    Shops, brands (product names) and categories are stored as ids into lookup
+    tables, and sizes as a bitmask with one bit per distinct size. Removed
+    products leave a dead row that a later addition reuses, so updates never
+    rebuild the arrays; they only grow, by doubling, when every row is taken.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        _import_numpy()
+        self.keys: List[Optional[ProductKey]] = []
+        self.row_of: Dict[ProductKey, int] = {}
+        self.free: List[int] = []
+        self.shops = Lookup()
+        self.brands = Lookup()
+        self.categories = Lookup()
+        self.sizes = Lookup()
+        self.price = np.zeros(capacity, np.float64)
+        self.stock = np.zeros(capacity, np.int64)
+        self.shop_id = np.zeros(capacity, np.int32)
+        self.brand_id = np.zeros(capacity, np.int32)
+        self.category_id = np.zeros(capacity, np.int32)
+        self.size_mask = np.zeros(capacity, np.uint64)
+        self.live = np.zeros(capacity, np.bool_)
+
+    @classmethod
+    def build(cls, products: Iterable[Tuple[ProductKey, Mapping]]) -> "ColumnarCatalog":
+        # Collect plain lists first; filling arrays one element at a time is far slower
+        columns = ([], [], [], [], [], [])
+        price, stock, shop_id, brand_id, category_id, size_mask = columns
+        catalog = cls(0)
+        for key, data in products:
+            catalog.row_of[key] = len(catalog.keys)
+            catalog.keys.append(key)
+            price.append(data["Price"])
+            stock.append(data["stock"])
+            shop_id.append(catalog.shops.id(key[0]))
+            brand_id.append(catalog.brands.id(key[1]))
+            category_id.append(catalog.categories.id(data.get("Category", "Uncategorized")))
+            size_mask.append(catalog.mask_of(data["Sizes"]))
+        catalog.price = np.array(price, np.float64)
+        catalog.stock = np.array(stock, np.int64)
+        catalog.shop_id = np.array(shop_id, np.int32)
+        catalog.brand_id = np.array(brand_id, np.int32)
+        catalog.category_id = np.array(category_id, np.int32)
+        catalog.size_mask = np.array(size_mask, np.uint64)
+        catalog.live = np.ones(len(catalog.keys), np.bool_)
+        return catalog
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def mask_of(self, sizes: Iterable[Hashable]) -> int:
+        """The size bitmask for sizes; raises ValueError once MAX_SIZES distinct sizes are in use."""
+        mask = 0
+        for size in sizes:
+            size_id = self.sizes.id(size)
+            if size_id >= MAX_SIZES:
+                raise ValueError(f"More than {MAX_SIZES} distinct sizes")
+            mask |= 1 << size_id
+        return mask
+
+    def add(self, key: ProductKey, data: Mapping):
+        """Mirror a new product, or refresh the row of an existing one."""
+        row = self.row_of.get(key)
+        if row is None:
+            row = self.free.pop() if self.free else len(self.keys)
+            if row == len(self.keys):
+                if row == len(self.price):
+                    self._grow()
+                self.keys.append(key)
+            else:
+                self.keys[row] = key
+            self.row_of[key] = row
+        self.price[row] = data["Price"]
+        self.stock[row] = data["stock"]
+        self.shop_id[row] = self.shops.id(key[0])
+        self.brand_id[row] = self.brands.id(key[1])
+        self.category_id[row] = self.categories.id(data.get("Category", "Uncategorized"))
+        self.size_mask[row] = self.mask_of(data["Sizes"])
+        self.live[row] = True
+
+    def remove(self, key: ProductKey):
+        row = self.row_of.pop(key, None)
+        if row is None:
+            return
+        self.live[row] = False
+        self.keys[row] = None
+        self.free.append(row)
+
+    def _grow(self):
+        capacity = max(2 * len(self.price), 1024)
+        for name in ("price", "stock", "shop_id", "brand_id", "category_id", "size_mask", "live"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def select(self, min_price: Optional[float] = None, max_price: Optional[float] = None, in_stock: bool = False,
+               shop_names: Iterable[str] = (), categories: Iterable[str] = (), sizes: Iterable = ()) -> "np.ndarray":
+        """Rows of the products passing every given filter (any of the values given for each)."""
+        count = len(self.keys)
+        mask = self.live[:count].copy()
+        if min_price is not None:
+            mask &= self.price[:count] >= min_price
+        if max_price is not None:
+            mask &= self.price[:count] <= max_price
+        if in_stock:
+            mask &= self.stock[:count] > 0
+        shop_names, categories, sizes = list(shop_names), list(categories), list(sizes)
+        if shop_names:
+            mask &= np.isin(self.shop_id[:count], [self.shops.ids.get(name, -1) for name in shop_names])
+        if categories:
+            mask &= np.isin(self.category_id[:count], [self.categories.ids.get(name, -1) for name in categories])
+        if sizes:
+            bits = 0
+            for size in sizes:
+                size_id = self.sizes.ids.get(size)
+                if size_id is not None:
+                    bits |= 1 << size_id
+            mask &= (self.size_mask[:count] & np.uint64(bits)) != 0
+        return np.flatnonzero(mask)
+
+    def sort_by_price(self, rows: "np.ndarray", descending: bool = False, limit: Optional[int] = None) -> "np.ndarray":
+        """rows ordered cheapest (or dearest) first, keeping at most limit; ties stay in row order."""
+        prices = self.price[rows]
+        if descending:
+            prices = -prices
+        if limit is not None and limit < len(rows):
+            # Find the limit-th price without a full sort, then keep the rows below it and,
+            # in row order, as many as fit of those equal to it
+            threshold = np.partition(prices, limit - 1)[limit - 1]
+            below = np.flatnonzero(prices < threshold)
+            tied = np.flatnonzero(prices == threshold)[:limit - len(below)]
+            nearest = np.concatenate((below, tied))
+            rows, prices = rows[nearest], prices[nearest]
+        return rows[np.argsort(prices, kind="stable")]
+
+    def keys_of(self, rows: "np.ndarray") -> List[ProductKey]:
+        keys = self.keys
+        return [keys[row] for row in rows.tolist()]
+
+    def brand_counts(self) -> Dict[str, int]:
+        """How many shops carry each brand."""
+        count = len(self.keys)
+        counts = np.bincount(self.brand_id[:count][self.live[:count]], minlength=len(self.brands.values))
+        carried = np.flatnonzero(counts)
+        names = self.brands.values
+        if len(carried) < len(names):
+            names = [names[brand] for brand in carried.tolist()]
+            counts = counts[carried]
+        return dict(zip(names, counts.tolist()))
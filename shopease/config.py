@@ -33,10 +33,56 @@ USER_CREDENTIALS_FILE = "user_credentials.json"
 ADMIN_CREDENTIALS_FILE = "admin_credentials.json"
 SHOPS_FILE = "shops.json"
 LOG_FILE = "logs/app.log"
+JOURNAL_FILE = "shops.journal"
+SQLITE_FILE = "shopease.db"
+SHARDS_DIR = "shops.d"
+SNAPSHOT_FILE = "shops.snap"
+PARSE_CACHE_FILE = ".shopease_cache/shops.pickle"
+
+# Storage settings
+STORAGE_BACKEND = "json"  # "json", "sqlite" or "sharded"; both are migrated from SHOPS_FILE on first run
+JOURNAL_ENABLED = True  # Append product changes to JOURNAL_FILE instead of rewriting SHOPS_FILE
+JOURNAL_CHECKPOINT_INTERVAL = 200  # Journal records before folding them back into SHOPS_FILE
+JOURNAL_FSYNC = False
+SHARD_LOAD_WORKERS = 8
+ASYNC_SAVES = True  # Write saves on a background thread instead of the Tk event loop
+SAVE_COALESCE_WINDOW = 0.5  # Seconds to wait for further saves before writing
+
+# Catalog settings
+COMPACT_CATALOG = True  # Hold products as __slots__ records instead of one dict per product
+SNAPSHOT_ENABLED = False  # Start from a memory-mapped SNAPSHOT_FILE while it is newer than the stored catalog
+STREAMING_LOAD = True  # Parse the catalog one shop at a time instead of with a single json.load
+STREAMING_FIRST_BATCH = 0  # If set, start the UI after this many shops and load the rest in the background
+LOAD_PROGRESS_INTERVAL = 100  # Report loading progress to the splash screen every this many shops
+PARSE_CACHE_ENABLED = True  # Reuse the parsed catalog while the stored files' mtime, size and hash are unchanged
+
+# Import settings
+IMPORT_BATCH_SIZE = 5000  # CSV rows validated per batch during a bulk inventory import
+IMPORT_MAX_ERRORS = 1000  # Row errors kept for the import report; further errors are only counted
+IMPORT_REINDEX_THRESHOLD = 1000  # Imports of more products than this rebuild the search indexes once instead
+
+# Export settings
+EXPORT_WORKERS = 4  # Threads formatting and compressing shops during a catalog export
+EXPORT_COMPRESS_LEVEL = 6  # gzip level for .gz catalog exports
+
+# Search settings
+SUGGESTION_LIMIT = 10  # Completions shown in a suggestion listbox
+SUGGESTION_ORDER = "popularity"  # "popularity" (most shops first) or "alphabetical"
+SUGGESTION_DEBOUNCE_MS = 150  # Wait this long after the last keystroke before searching
+SUGGESTION_POLL_MS = 20  # How often the Tk loop checks for a finished background search
+FACET_RESULT_LIMIT = 100  # Products listed by a faceted search; facet counts still cover every match
+QUERY_RESULT_LIMIT = 50  # Products listed by the global search bar
+QUERY_CACHE_SIZE = 128  # Search results kept for repeated queries; 0 disables the cache
+QUERY_CACHE_LOG_INTERVAL = 500  # Log query cache hit rates every this many searches; 0 only logs on exit
+COLUMNAR_ENGINE = True  # Mirror the catalog into NumPy arrays for vectorized filters, if numpy is installed
+RENDER_CHUNK_SIZE = 40  # Result blocks written to a text view per Tk callback
+RENDER_CHUNK_INTERVAL_MS = 1  # Pause between chunks, leaving the event loop free to redraw and handle input
+SCREEN_CACHE_SIZE = 8  # Screens kept built between visits, least recently shown dropped first; 0 rebuilds on every visit
 
 # Application settings
 APP_NAME = "ShopEase"
 APP_VERSION = "1.0.0"
 WINDOW_SIZE = "1200x800"
+STARTUP_BUDGET_MS = 500  # Target from launch to the first drawn window and splash; slower starts log a warning
 ICON_PATH = "shopease/assets/Codoit-Logo.ico"
 SPLASH_PATH = "shopease/assets/Codoit Logo.jpeg"
\ No newline at end of file
@@ -1,7 +1,27 @@
+import copy
 import json
 import logging
-from typing import Dict, List
-from .config import USER_CREDENTIALS_FILE, ADMIN_CREDENTIALS_FILE, SHOPS_FILE, LOG_FILE
+import pickle
+import sqlite3
+import threading
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterable, Iterator, Optional, Set, Tuple
+from .config import (
+    LOG_FILE, SNAPSHOT_FILE, STORAGE_BACKEND, ASYNC_SAVES, SAVE_COALESCE_WINDOW, COMPACT_CATALOG, SNAPSHOT_ENABLED,
+    STREAMING_LOAD, STREAMING_FIRST_BATCH, PARSE_CACHE_ENABLED, PARSE_CACHE_FILE, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS,
+    EXPORT_WORKERS, EXPORT_COMPRESS_LEVEL, LOAD_PROGRESS_INTERVAL, IMPORT_REINDEX_THRESHOLD
+)
+from .catalog import Product, Shop, compact_shops, copy_shops
+from .parse_cache import ParseCache
+from .service import CatalogService
+from .storage import create_backend
+from .writer import BackgroundWriter
+
+# Import, export and snapshots are imported where they are used, keeping them off the startup path
+if TYPE_CHECKING:
+    from .export import ProgressCallback
+    from .importer import ImportResult
 
 # Configure logging
 logging.basicConfig(
@@ -10,6 +30,9 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Called as loading proceeds with a description of the current step and the fraction done
+LoadProgress = Callable[[str, float], None]
+
 # Initial shop data
 INITIAL_SHOPS = {
     "Yuvarani foot wears": {
@@ -24,7 +47,7 @@ INITIAL_SHOPS = {
 }
 
 class DataHandler:
-    def __init__(self):
+    def __init__(self, load: bool = True):
         self.shops = {}
         self.admin_credentials = {
             "username": "admin",
@@ -33,75 +56,395 @@ class DataHandler:
             "shop_name": "Old Shop"
         }
         self.user_credentials: Dict[str, Dict] = {}
-        self.load_data()
+        self.dirty_shops: Set[str] = set()
+        # Set when a save had to wait for a streamed load to finish; see _catalog_loaded()
+        self.save_deferred = False
+        self.lock = threading.RLock()
+        # Held for the whole of each write to the stored catalog, which only takes lock to copy what it writes;
+        # always taken before lock
+        self.write_lock = threading.RLock()
+        # loaded is only set once every shop is in memory; load_finished is also set when loading fails,
+        # after which nothing is saved, as that would overwrite the stored catalog with part of it
+        self.loaded = threading.Event()
+        self.load_finished = threading.Event()
+        self.loader: Optional[threading.Thread] = None
+        self.backend = create_backend(STORAGE_BACKEND)
+        self.writer = BackgroundWriter(SAVE_COALESCE_WINDOW) if ASYNC_SAVES else None
+        self.parse_cache = ParseCache(PARSE_CACHE_FILE) if PARSE_CACHE_ENABLED else None
+        self.modified = False
+        self.load_source: Optional[str] = None
+        self.load_started: Optional[float] = None
+        # Searches go through the catalog service, which is told of every change made here
+        self.catalog = CatalogService(lambda: self.shops, self.lock, indexed_store=self._indexed_store)
+        if load:
+            self.load_data()
 
-    def load_data(self):
-        """Load data from JSON files."""
-        try:
-            with open(SHOPS_FILE, "r") as file:
-                self.shops = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.shops = INITIAL_SHOPS
-            self.save_shops()
-            logging.info("Initialized shops data")
+    def load(self, progress: Optional[LoadProgress] = None):
+        """Load the catalog and credentials for a handler made with load=False.
+
+        progress(text, fraction) is called from the loading thread as each step starts.
+        The search indexes are not built here; see CatalogService.build_in_background().
+        """
+        self.load_data(progress)
+        if progress:
+            progress("Ready", 1.0)
 
+    def load_data(self, progress: Optional[LoadProgress] = None):
+        """Load data from the configured storage backend."""
+        report = progress or (lambda text, fraction: None)
+        self.loaded.clear()
+        self.load_finished.clear()
+        self.loader = None
+        self.load_started = time.perf_counter()
+        report("Loading catalog...", 0.0)
         try:
-            with open(ADMIN_CREDENTIALS_FILE, "r") as file:
-                self.admin_credentials = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
+            snapshot = None
+            if SNAPSHOT_ENABLED:
+                from .snapshot import open_snapshot
+                snapshot = open_snapshot(SNAPSHOT_FILE, self.backend.source_files())
+            cached = self._read_parse_cache() if snapshot is None else None
+            if snapshot is not None:
+                self.shops = snapshot
+                self._catalog_loaded("snapshot")
+            elif cached is not None:
+                self.shops = cached
+                self._catalog_loaded("parse cache")
+            elif not (STREAMING_LOAD and hasattr(self.backend, "iter_shops") and self._stream_shops(report)):
+                shops = self.backend.load_shops()
+                if shops is None:
+                    self.shops = compact_shops(INITIAL_SHOPS) if COMPACT_CATALOG else INITIAL_SHOPS
+                    self.save_shops()
+                    logging.info("Initialized shops data")
+                else:
+                    self.shops = compact_shops(shops) if COMPACT_CATALOG else shops
+                self._catalog_loaded(STORAGE_BACKEND)
+        finally:
+            # A load continuing on the loader thread ends there instead
+            if self.loader is None:
+                self._load_ended()
+
+        report(f"Loaded {len(self.shops)} shops. Loading accounts...", 0.6)
+        admin_credentials = self.backend.load_credentials("admin")
+        if admin_credentials is None:
             self.save_admin_credentials()
             logging.info("Initialized admin credentials")
+        else:
+            self.admin_credentials = admin_credentials
 
-        try:
-            with open(USER_CREDENTIALS_FILE, "r") as file:
-                self.user_credentials = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
+        user_credentials = self.backend.load_credentials("users")
+        if user_credentials is None:
             self.save_user_credentials()
             logging.info("Initialized user credentials")
+        else:
+            self.user_credentials = user_credentials
 
-    def save_shops(self):
-        """Save shop data to JSON file."""
+    def _stream_shops(self, report: LoadProgress) -> bool:
+        """Build the catalog one shop at a time; False if there is no readable stored catalog.
+
+        With STREAMING_FIRST_BATCH set, this returns as soon as that many shops
+        are loaded and the remaining shops are added by a background thread.
+        """
+        shops = {}
+
+        def progress(fraction: float):
+            # Reading the catalog takes the splash bar up to 0.6, where loading the accounts starts
+            if len(shops) % LOAD_PROGRESS_INTERVAL == 0:
+                report(f"Loading catalog... {len(shops)} shops", 0.6 * fraction)
+
+        iterator = self.backend.iter_shops(progress)
         try:
-            with open(SHOPS_FILE, "w") as file:
-                json.dump(self.shops, file, indent=4)
-        except IOError as e:
-            logging.error(f"Error saving shops: {e}")
+            for shop_name, shop_data in iterator:
+                shops[shop_name] = Shop.from_dict(shop_data) if COMPACT_CATALOG else shop_data
+                if len(shops) == STREAMING_FIRST_BATCH:
+                    self.shops = shops
+                    self.loader = threading.Thread(target=self._stream_remaining, args=(iterator,),
+                                                   name="shopease-loader", daemon=True)
+                    self.loader.start()
+                    return True
+        except FileNotFoundError:
+            return False
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f"Error reading shops: {e}")
+            return False
+        self.shops = shops
+        self._finish_stream()
+        return True
 
-    def save_admin_credentials(self):
-        """Save admin credentials to JSON file."""
+    def _stream_remaining(self, iterator: Iterator[Tuple[str, Dict]]):
+        batch = {}
         try:
-            with open(ADMIN_CREDENTIALS_FILE, "w") as file:
-                json.dump(self.admin_credentials, file, indent=4)
-        except IOError as e:
-            logging.error(f"Error saving admin credentials: {e}")
+            for shop_name, shop_data in iterator:
+                batch[shop_name] = Shop.from_dict(shop_data) if COMPACT_CATALOG else shop_data
+                if len(batch) >= STREAMING_FIRST_BATCH:
+                    self._merge_shops(batch)
+                    batch = {}
+            self._merge_shops(batch)
+            self._finish_stream()
+        except (OSError, json.JSONDecodeError) as e:
+            # The shops read so far stay browsable, but loaded is never set
+            logging.error(f"Stopped loading shops after {len(self.shops)} entries: {e}")
+        finally:
+            self._load_ended()
+
+    def _merge_shops(self, batch: Dict):
+        # Swap in a new dict so that callers iterating the old one are not disturbed
+        with self.lock:
+            shops = dict(self.shops)
+            shops.update(batch)
+            self.shops = shops
+            self.catalog.shops_added(batch)
+
+    def _finish_stream(self):
+        with self.write_lock, self.lock:
+            self.backend.replay_journal(self.shops)
+        self._catalog_loaded(f"{STORAGE_BACKEND} (streamed)")
+
+    def _catalog_loaded(self, source: str):
+        """Called once every shop is in memory."""
+        self.load_source = source
+        # Journal replay bypasses the search index, so rebuild it on next use
+        self.catalog.reset()
+        elapsed = (time.perf_counter() - self.load_started) * 1000
+        logging.info(f"Loaded {len(self.shops)} shops from {source} in {elapsed:.1f} ms")
+        if SNAPSHOT_ENABLED and source != "snapshot":
+            self._submit("snapshot", self._write_snapshot)
+        if self.parse_cache and source not in ("snapshot", "parse cache"):
+            self._submit("parse_cache", self._write_parse_cache)
+        with self.lock:
+            self.loaded.set()
+            deferred, self.save_deferred = self.save_deferred, False
+        if deferred:
+            self.save_shops()
+
+    def _load_ended(self):
+        """Called when loading stops, whether or not every shop was loaded."""
+        with self.lock:
+            if not self.loaded.is_set():
+                logging.error("The catalog did not load completely; changes to it will not be saved")
+            self.load_finished.set()
+
+    def _read_parse_cache(self) -> Optional[Dict]:
+        if not self.parse_cache:
+            return None
+        return self.parse_cache.load(self.backend.source_files(), tag=(STORAGE_BACKEND, COMPACT_CATALOG))
+
+    def _write_parse_cache(self):
+        with self.write_lock:
+            with self.lock:
+                # Unsaved changes would make the cache disagree with the files it is keyed on,
+                # and a memory-mapped snapshot cannot be pickled
+                if self.dirty_shops or not isinstance(self.shops, dict):
+                    return
+                shops = copy_shops(self.shops)
+            try:
+                self.parse_cache.store(self.backend.source_files(), shops, tag=(STORAGE_BACKEND, COMPACT_CATALOG))
+            except (OSError, pickle.PicklingError) as e:
+                logging.error(f"Error writing parse cache: {e}")
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Block until loading ends; True if the whole catalog was loaded."""
+        self.load_finished.wait(timeout)
+        return self.loaded.is_set()
+
+    def _submit(self, key: Optional[Hashable], job: Callable[[], None]):
+        """Run a save job on the background writer, or inline if saves are synchronous."""
+        if self.writer:
+            self.writer.submit(key, job)
+        else:
+            job()
+
+    def save_shops(self):
+        """Save the shops marked dirty, or the whole catalog if none are."""
+        self._submit("shops", self._write_shops)
+
+    def _write_shops(self):
+        with self.write_lock:
+            with self.lock:
+                if not self.loaded.is_set():
+                    if self.load_finished.is_set():
+                        logging.error(f"Not saving {len(self.dirty_shops)} changed shops: the catalog failed to load")
+                        return
+                    # Until every shop is loaded, saving would drop the ones still to come
+                    self.save_deferred = True
+                    return
+                dirty = set(self.dirty_shops) or None
+                # Searches and edits only wait for the copy, not for it to be written
+                shops = copy_shops(self.shops)
+            try:
+                self.backend.save_shops(shops, dirty)
+            except (IOError, sqlite3.Error) as e:
+                logging.error(f"Error saving shops: {e}")
+                return
+            finally:
+                # Even a failed save may have rewritten part of the stored catalog; its shops stay dirty
+                self._catalog_written()
+            with self.lock:
+                self.dirty_shops -= dirty or set()
+
+    def _catalog_written(self):
+        self.modified = True
+        if self.parse_cache:
+            self.parse_cache.invalidate()
+
+    def _write_snapshot(self):
+        from .snapshot import SnapshotError, write_snapshot
+        with self.write_lock:
+            with self.lock:
+                shops = copy_shops(self.shops)
+            try:
+                write_snapshot(SNAPSHOT_FILE, shops)
+            except (IOError, SnapshotError) as e:
+                logging.error(f"Error writing catalog snapshot: {e}")
+
+    def _indexed_store(self):
+        """The backend, for CatalogService, while it can search its own indexes and is up to date."""
+        if self.dirty_shops or not self.loaded.is_set() or not hasattr(self.backend, "find_products"):
+            return None
+        return self.backend
+
+    def mark_dirty(self, shop_name: str):
+        """Record that a shop has changed since it was last saved."""
+        self.dirty_shops.add(shop_name)
+
+    def save_admin_credentials(self):
+        """Save admin credentials."""
+        self._submit("admin", partial(self._write_credentials, "admin", copy.deepcopy(self.admin_credentials)))
 
     def save_user_credentials(self):
-        """Save user credentials to JSON file."""
+        """Save user credentials."""
+        self._submit("users", partial(self._write_credentials, "users", copy.deepcopy(self.user_credentials)))
+
+    def _write_credentials(self, kind: str, data: Dict):
         try:
-            with open(USER_CREDENTIALS_FILE, "w") as file:
-                json.dump(self.user_credentials, file, indent=4)
-        except IOError as e:
-            logging.error(f"Error saving user credentials: {e}")
+            self.backend.save_credentials(kind, data)
+        except (IOError, sqlite3.Error) as e:
+            logging.error(f"Error saving {kind} credentials: {e}")
+
+    def add_product(self, shop_name: str, product_name: str, data: Dict):
+        """Add or replace a product in a shop."""
+        if COMPACT_CATALOG:
+            data = Product.from_dict(data)
+        with self.lock:
+            self.shops[shop_name]["Products"][product_name] = data
+            self.mark_dirty(shop_name)
+            self.catalog.product_changed(shop_name, product_name, data)
+        self._record({"op": "put", "shop": shop_name, "product": product_name, "data": data})
+
+    def update_product(self, shop_name: str, product_name: str, changes: Dict):
+        """Update selected fields of an existing product."""
+        with self.lock:
+            product = self.shops[shop_name]["Products"][product_name]
+            product.update(changes)
+            self.mark_dirty(shop_name)
+            self.catalog.product_changed(shop_name, product_name, product)
+        self._record({"op": "patch", "shop": shop_name, "product": product_name, "data": changes})
 
-    def export_inventory(self, shop_name: str, filename: str):
-        """Export shop inventory to CSV."""
+    def delete_product(self, shop_name: str, product_name: str):
+        """Remove a product from a shop."""
+        with self.lock:
+            del self.shops[shop_name]["Products"][product_name]
+            self.mark_dirty(shop_name)
+            self.catalog.product_removed(shop_name, product_name)
+        self._record({"op": "delete", "shop": shop_name, "product": product_name})
+
+    def _record(self, record: Dict):
+        """Persist a single product mutation, whose shop was marked dirty along with the change."""
+        self._submit(self.backend.coalesce_key(record), partial(self._write_record, record))
+
+    def _write_record(self, record: Dict):
+        with self.write_lock:
+            # Backends write at most the record's own shop here, which is cheap enough to do under the lock
+            with self.lock:
+                try:
+                    written = self.backend.record(self.shops, record)
+                except (IOError, sqlite3.Error) as e:
+                    logging.error(f"Error saving {record['op']} of {record['product']}: {e}")
+                    return
+                finally:
+                    # As in _write_shops, a failed write leaves the shop dirty but may have changed the files
+                    self._catalog_written()
+                if written:
+                    self.dirty_shops.discard(record["shop"])
+                    return
+            # The backend asked for the whole catalog to be saved, e.g. for a journal checkpoint;
+            # the shop stays dirty until then, and _write_shops defers it while the catalog loads
+            self._write_shops()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued save has been written."""
+        return self.writer.flush(timeout) if self.writer else True
+
+    def close(self):
+        """Flush pending saves and release the storage backend; call on shutdown."""
+        # Queued saves may still find that they have to wait for the load
+        self.flush()
+        if self.save_deferred and self.load_started is not None:
+            logging.info("Waiting for the catalog to finish loading to save changes")
+            if not self.wait_until_loaded():
+                logging.error("Changes made while the catalog was loading were not saved, as it failed to load")
+        if self.writer:
+            self.writer.close()
+            logging.info(f"Background writer stats: {self.writer.stats()}")
+        self.catalog.log_stats()
+        self.backend.close()
+        # Closing can touch the stored files (e.g. a SQLite checkpoint), so refresh the cache last
+        if self.parse_cache and self.loaded.is_set() and (self.modified or self.load_source != "parse cache"):
+            self._write_parse_cache()
+
+    def import_inventory(self, shop_name: str, filename: str,
+                         progress: Optional[Callable[[int], None]] = None) -> Optional["ImportResult"]:
+        """Import products from a CSV, such as a CSV catalog export, with a single save.
+
+        Valid rows add or replace products; invalid rows are reported in the result.
+        Returns None, changing nothing, if the shop is unknown or the file unreadable.
+        """
         import csv
+        from .importer import read_inventory
         if shop_name not in self.shops:
-            return False
+            return None
+        started = time.perf_counter()
+        try:
+            result = read_inventory(filename, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS,
+                                    Product.from_dict if COMPACT_CATALOG else dict, progress)
+        except (IOError, UnicodeDecodeError, csv.Error) as e:
+            logging.error(f"Error importing inventory from {filename}: {e}")
+            return None
+
+        with self.lock:
+            products = self.shops[shop_name]["Products"]
+            result.updated = sum(1 for product_name in result.products if product_name in products)
+            result.added = len(result.products) - result.updated
+            products.update(result.products)
+            if result.products:
+                self.mark_dirty(shop_name)
+            if len(result.products) > IMPORT_REINDEX_THRESHOLD:
+                # Each incremental index update costs O(catalog), so one rebuild is cheaper for bulk imports
+                self.catalog.reset()
+            else:
+                for product_name, data in result.products.items():
+                    self.catalog.product_changed(shop_name, product_name, data)
+        result.products = {}
+        if result.imported:
+            self.save_shops()
+
+        elapsed = time.perf_counter() - started
+        logging.info(f"Imported {result.imported} products into {shop_name} from {filename} "
+                     f"({result.rows} rows, {result.error_count} rejected) in {elapsed:.2f} s "
+                     f"({result.rows / elapsed if elapsed else 0:.0f} rows/s)")
+        return result
+
+    def export_catalog(self, filename: str, shop_names: Optional[Iterable[str]] = None,
+                       progress: Optional["ProgressCallback"] = None) -> Optional[int]:
+        """Export every shop, or only shop_names, to a .csv, .jsonl or .gz file; returns the row count."""
+        from .export import export_catalog
+        started = time.perf_counter()
         try:
-            with open(filename, "w", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(["Product", "Stock", "Price", "Sizes", "Category"])
-                for product, data in self.shops[shop_name]["Products"].items():
-                    writer.writerow([
-                        product,
-                        data["stock"],
-                        data["Price"],
-                        ",".join(map(str, data["Sizes"])),
-                        data.get("Category", "")
-                    ])
-            logging.info(f"Exported inventory for {shop_name} to {filename}")
-            return True
+            rows = export_catalog(self.shops, filename, shop_names, EXPORT_WORKERS, EXPORT_COMPRESS_LEVEL,
+                                  self.lock, progress)
         except IOError as e:
-            logging.error(f"Error exporting inventory: {e}")
-            return False
\ No newline at end of file
+            logging.error(f"Error exporting catalog: {e}")
+            return None
+        elapsed = time.perf_counter() - started
+        logging.info(f"Exported {rows} products to {filename} in {elapsed:.2f} s "
+                     f"({rows / elapsed if elapsed else 0:.0f} rows/s)")
+        return rows
\ No newline at end of file
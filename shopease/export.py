@@ -0,0 +1,109 @@
+import csv
+import gzip
+import io
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Column layout of catalog CSV exports; import_inventory ignores the Shop column
+CATALOG_COLUMNS = ("Shop", "Product", "Stock", "Price", "Sizes", "Category")
+FORMATS = ("csv", "jsonl")
+
+ProgressCallback = Callable[[int, int, int], None]
+
+
+def export_format(filename: str) -> Tuple[str, bool]:
+    """Return (format, compressed) for filename, e.g. ("jsonl", True) for "catalog.jsonl.gz"."""
+    name = filename.lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[:-3]
+    return ("jsonl" if name.endswith((".jsonl", ".json")) else "csv"), compressed
+
+
+def format_csv(shop_name: str, products: List[Tuple[str, Dict]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for product, data in products:
+        writer.writerow([
+            shop_name,
+            product,
+            data["stock"],
+            data["Price"],
+            ",".join(map(str, data["Sizes"])),
+            data.get("Category", "")
+        ])
+    return buffer.getvalue()
+
+
+def format_jsonl(shop_name: str, products: List[Tuple[str, Dict]]) -> str:
+    return "".join(
+        json.dumps({"Shop": shop_name, "Product": product, **data}, separators=(",", ":")) + "\n"
+        for product, data in products
+    )
+
+
+FORMATTERS = {"csv": format_csv, "jsonl": format_jsonl}
+
+
+def export_catalog(shops: Dict, filename: str, shop_names: Optional[Iterable[str]] = None,
+                   workers: int = 4, compress_level: int = 6, lock: Optional[threading.RLock] = None,
+                   progress: Optional[ProgressCallback] = None) -> int:
+    """Export the products of shop_names (default: every shop) to filename and return the row count.
+
+    Shops are formatted, and compressed for .gz files, on a pool of worker threads
+    and written in order as they complete, with at most two chunks per worker held
+    in memory. Gzip output is one gzip member per shop, which gzip readers treat as
+    a single stream. progress is called with (shops done, shops total, rows) after
+    each shop. Raises IOError if the file cannot be written.
+    """
+    fmt, compressed = export_format(filename)
+    formatter = FORMATTERS[fmt]
+    shop_names = [name for name in (shops if shop_names is None else shop_names) if name in shops]
+    lock = lock or threading.RLock()
+
+    def encode(shop_name: str) -> Tuple[bytes, int]:
+        # Copy the product list under the lock; formatting runs unlocked
+        with lock:
+            products = list(shops[shop_name]["Products"].items())
+        chunk = formatter(shop_name, products).encode("utf-8")
+        if compressed:
+            chunk = gzip.compress(chunk, compresslevel=compress_level, mtime=0)
+        return chunk, len(products)
+
+    rows = 0
+    temp_file = filename + ".tmp"
+    try:
+        with open(temp_file, "wb") as file, ThreadPoolExecutor(max_workers=workers) as executor:
+            if fmt == "csv":
+                header = ",".join(CATALOG_COLUMNS).encode("utf-8") + b"\r\n"
+                file.write(gzip.compress(header, compresslevel=compress_level, mtime=0) if compressed else header)
+            pending = deque()
+            names = iter(shop_names)
+            done = 0
+            while True:
+                while len(pending) < workers * 2:
+                    shop_name = next(names, None)
+                    if shop_name is None:
+                        break
+                    pending.append(executor.submit(encode, shop_name))
+                if not pending:
+                    break
+                chunk, count = pending.popleft().result()
+                file.write(chunk)
+                rows += count
+                done += 1
+                if progress:
+                    progress(done, len(shop_names), rows)
+        os.replace(temp_file, filename)
+    except BaseException:
+        # Leave no partial export behind
+        try:
+            os.remove(temp_file)
+        except FileNotFoundError:
+            pass
+        raise
+    return rows
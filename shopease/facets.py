@@ -0,0 +1,161 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Facets with a bitmap per value; shops are filtered from their product lists instead,
+# since a bitmap per shop would cost as much memory as the catalog has shops
+FACETS = ("category", "size", "in_stock")
+
+FacetValue = Tuple[str, Hashable]
+
+
+class FacetResult:
+    """Outcome of a faceted search: how many products matched, the first of them, and facet counts."""
+
+    def __init__(self, total: int, matches: List[Tuple[str, str, Any]], counts: Dict[str, Dict[Hashable, int]]):
+        self.total = total
+        self.matches = matches
+        # Facet -> value -> number of matching products with it, over all matches
+        self.counts = counts
+
+
+def facet_values(data: Mapping) -> List[FacetValue]:
+    """The (facet, value) pairs a product is filed under."""
+    values = [("category", data.get("Category", "Uncategorized")), ("in_stock", data["stock"] > 0)]
+    values += [("size", size) for size in data["Sizes"]]
+    return values
+
+
+def bitmap_of(rows: Iterable[int], size: Optional[int] = None) -> int:
+    """An int with the given bits set, all below size if given.
+
+    The bits are written as the digits of a binary numeral and parsed in one go,
+    which is far cheaper than an OR into an ever larger int per row.
+    """
+    if size is None:
+        rows = list(rows)
+        size = max(rows) + 1 if rows else 0
+    digits = bytearray(b"0") * size
+    for row in rows:
+        digits[row] = 49  # ord("1")
+    return int(digits[::-1], 2) if size else 0
+
+
+def iter_rows(bitmap: int) -> Iterable[int]:
+    """The set bits of bitmap, lowest first."""
+    bits = bin(bitmap)[:1:-1]
+    row = bits.find("1")
+    while row != -1:
+        yield row
+        row = bits.find("1", row + 1)
+
+
+class FacetIndex:
+    """Bitmap indexes over product facets, with one bit per product row.
+
+    Each facet value maps to an int whose set bits are the rows of the products
+    that have it, so combined filters are answered with bitwise AND (across
+    facets) and OR (within a facet), and facet counts with int.bit_count.
+    Rows of deleted products are reused by later additions.
+    """
+
+    def __init__(self):
+        self.keys: List[Optional[Hashable]] = []
+        self.row_of: Dict[Hashable, int] = {}
+        self.free: List[int] = []
+        self.bitmaps: Dict[str, Dict[Hashable, int]] = {facet: {} for facet in FACETS}
+        self.live = 0
+
+    @classmethod
+    def build(cls, products: Iterable[Tuple[Hashable, Mapping]]) -> "FacetIndex":
+        index = cls()
+        rows: Dict[FacetValue, List[int]] = {}
+        for row, (key, data) in enumerate(products):
+            index.keys.append(key)
+            index.row_of[key] = row
+            for value in facet_values(data):
+                rows.setdefault(value, []).append(row)
+        for (facet, value), value_rows in rows.items():
+            index.bitmaps[facet][value] = bitmap_of(value_rows, len(index.keys))
+        index.live = (1 << len(index.keys)) - 1
+        return index
+
+    def add(self, key: Hashable, data: Mapping):
+        """File a new product, or re-file one whose facets may have changed."""
+        values = set(facet_values(data))
+        row = self.row_of.get(key)
+        if row is not None:
+            # A product's old values are read back from the bitmaps, as it may have been changed in place
+            old_values = self.values_at(row)
+            if values == old_values:
+                return
+            self._clear(row, old_values)
+        else:
+            row = self.free.pop() if self.free else len(self.keys)
+            if row == len(self.keys):
+                self.keys.append(key)
+            else:
+                self.keys[row] = key
+            self.row_of[key] = row
+            self.live |= 1 << row
+        bit = 1 << row
+        for facet, value in values:
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+
+    def remove(self, key: Hashable):
+        row = self.row_of.pop(key, None)
+        if row is None:
+            return
+        self._clear(row, self.values_at(row))
+        self.live &= ~(1 << row)
+        self.keys[row] = None
+        self.free.append(row)
+
+    def values_at(self, row: int) -> Set[FacetValue]:
+        return {
+            (facet, value)
+            for facet, bitmaps in self.bitmaps.items()
+            for value, bitmap in bitmaps.items() if bitmap >> row & 1
+        }
+
+    def _clear(self, row: int, values: Iterable[FacetValue]):
+        mask = ~(1 << row)
+        for facet, value in values:
+            bitmap = self.bitmaps[facet][value] & mask
+            if bitmap:
+                self.bitmaps[facet][value] = bitmap
+            else:
+                del self.bitmaps[facet][value]
+
+    def select(self, filters: Dict[str, Iterable[Hashable]]) -> int:
+        """Rows matching every facet in filters, and any of the values given for each."""
+        result = self.live
+        for facet, values in filters.items():
+            bitmaps = self.bitmaps[facet]
+            union = 0
+            for value in values:
+                union |= bitmaps.get(value, 0)
+            result &= union
+        return result
+
+    def bitmap_for(self, keys: Iterable[Hashable]) -> int:
+        """The rows of keys, e.g. the products found by a name or price query."""
+        row_of = self.row_of
+        return bitmap_of(row_of[key] for key in keys if key in row_of)
+
+    def counts(self, bitmap: int, facet: str) -> Dict[Hashable, int]:
+        """How many of the rows in bitmap have each value of facet."""
+        counts = {}
+        for value, value_bitmap in self.bitmaps[facet].items():
+            count = (bitmap & value_bitmap).bit_count()
+            if count:
+                counts[value] = count
+        return counts
+
+    def keys_of(self, bitmap: int, limit: Optional[int] = None) -> List[Hashable]:
+        keys = []
+        for row in iter_rows(bitmap):
+            if limit is not None and len(keys) >= limit:
+                break
+            keys.append(self.keys[row])
+        return keys
@@ -0,0 +1,108 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def trigrams(text: str) -> Set[str]:
+    """The 3-character substrings of text, lower-cased and padded so word edges count too."""
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """Edit distance between a and b, or max_distance + 1 as soon as it is known to exceed max_distance.
+
+    With max_distance set, only the diagonal band of cells that can stay within
+    max_distance is computed.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is None:
+        max_distance = len(a)
+    if len(a) - len(b) > max_distance:
+        return max_distance + 1
+    over = max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        current = [over] * (len(b) + 1)
+        if low == 1:
+            current[0] = i
+        best = current[0]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < best:
+                best = cost
+        if best > max_distance:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+def default_max_distance(query: str) -> int:
+    """Edits tolerated for a query: one for short words, two otherwise."""
+    return 1 if len(query) <= 4 else 2
+
+
+class TrigramIndex:
+    """Typo-tolerant lookup of names through an index from trigrams to the names containing them.
+
+    A name within k edits of the query shares all but at most 3k of the query's
+    trigrams, so it must contain at least one of the query's 3k + 1 rarest
+    trigrams. Only names found through those, and sharing enough trigrams, are
+    checked with the edit distance, which keeps lookups fast however many names
+    are indexed.
+    """
+
+    def __init__(self, names=()):
+        self.postings: Dict[str, Set[str]] = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str):
+        for gram in trigrams(name):
+            postings = self.postings.get(gram)
+            if postings is None:
+                postings = self.postings[gram] = set()
+            postings.add(name)
+
+    def remove(self, name: str):
+        for gram in trigrams(name):
+            postings = self.postings.get(gram)
+            if postings is not None:
+                postings.discard(name)
+                if not postings:
+                    del self.postings[gram]
+
+    def search(self, query: str, limit: int = 10, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Names within max_distance edits of query (case-insensitive), as (name, distance), closest first."""
+        query = query.strip().lower()
+        if not query:
+            return []
+        grams = sorted(trigrams(query), key=lambda gram: len(self.postings.get(gram, ())))
+        if max_distance is None:
+            max_distance = default_max_distance(query)
+        # Beyond this, a match might share no trigram with the query and could not be found
+        max_distance = min(max_distance, (len(grams) - 1) // 3)
+        candidates: Set[str] = set()
+        for gram in grams[:3 * max_distance + 1]:
+            candidates |= self.postings.get(gram, set())
+
+        query_grams = set(grams)
+        min_shared = len(query_grams) - 3 * max_distance
+        matches = []
+        for name in candidates:
+            if abs(len(name) - len(query)) > max_distance:
+                continue
+            # Cheap count filter before the quadratic edit distance
+            if len(query_grams & trigrams(name)) < min_shared:
+                continue
+            distance = levenshtein(query, name.lower(), max_distance)
+            if distance <= max_distance:
+                matches.append((distance, name))
+        matches.sort()
+        return [(name, distance) for distance, name in matches[:limit]]
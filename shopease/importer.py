@@ -0,0 +1,128 @@
+import csv
+import math
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Columns read from an inventory CSV; the Shop column of a CSV catalog export is ignored
+INVENTORY_COLUMNS = ("Product", "Stock", "Price", "Sizes", "Category")
+REQUIRED_COLUMNS = ("Product", "Stock", "Price")
+
+Row = Tuple[int, List[str]]
+
+
+class ImportResult:
+    """Outcome of an inventory import: the validated products and the rows that were rejected."""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.products: Dict[str, Dict] = {}
+        self.rows = 0
+        self.added = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors: List[Tuple[int, str]] = []
+
+    @property
+    def imported(self) -> int:
+        return self.added + self.updated
+
+    def add_error(self, line_number: int, message: str):
+        """Record a rejected row, keeping at most max_errors messages."""
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_number, message))
+
+
+def parse_number(text: str):
+    """Parse text as an int when it is integral, otherwise as a float; inf and nan raise ValueError."""
+    try:
+        return int(text)
+    except ValueError:
+        value = float(text)
+    if not math.isfinite(value):
+        raise ValueError(f"Not a finite number: {text!r}")
+    return value
+
+
+def parse_inventory_row(row: List[str]) -> Tuple[str, Dict]:
+    """Turn one CSV row, already in INVENTORY_COLUMNS order, into (product name, product data).
+
+    Raises ValueError if the row is invalid.
+    """
+    product_name, stock, price, sizes, category = (cell.strip() for cell in row)
+    if not product_name:
+        raise ValueError("Product name cannot be empty")
+
+    try:
+        stock = int(stock)
+    except ValueError:
+        raise ValueError(f"Invalid stock {stock!r}")
+    if stock < 0:
+        raise ValueError("Stock cannot be negative")
+
+    try:
+        price = parse_number(price)
+    except ValueError:
+        raise ValueError(f"Invalid price {price!r}")
+    if not price > 0:
+        raise ValueError("Price must be positive")
+
+    sizes = [int(size) if size.isdigit() else size
+             for size in (size.strip() for size in sizes.split(",")) if size]
+    data = {"stock": stock, "Price": price, "Sizes": sizes}
+    if category:
+        data["Category"] = category
+    return product_name, data
+
+
+def iter_batches(reader: Iterator[List[str]], line_number: Callable[[], int], batch_size: int) -> Iterator[List[Row]]:
+    """Group CSV rows into lists of (line number, row) of at most batch_size rows."""
+    batch: List[Row] = []
+    for row in reader:
+        if not any(row):
+            continue
+        batch.append((line_number(), row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def read_inventory(filename: str, batch_size: int, max_errors: int, convert: Callable[[Dict], Dict] = dict,
+                   progress: Optional[Callable[[int], None]] = None) -> ImportResult:
+    """Stream and validate an inventory CSV batch by batch.
+
+    Only the current batch of raw rows and the first max_errors error messages
+    are held besides the validated products, which become the catalog entries.
+    Later rows for the same product replace earlier ones.  Raises IOError,
+    UnicodeDecodeError or csv.Error if the file cannot be read.
+    """
+    result = ImportResult(max_errors)
+    with open(filename, "r", newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        columns = {name.strip(): index for index, name in enumerate(header or [])}
+        missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            result.add_error(1, f"Missing column(s): {', '.join(missing)}; expected {', '.join(INVENTORY_COLUMNS)}")
+            return result
+        indexes = [columns.get(name) for name in INVENTORY_COLUMNS]
+        in_order = indexes == list(range(len(INVENTORY_COLUMNS)))
+        width = len(INVENTORY_COLUMNS)
+
+        for batch in iter_batches(reader, lambda: reader.line_num, batch_size):
+            for line_number, row in batch:
+                if in_order:
+                    cells = row[:width] if len(row) >= width else row + [""] * (width - len(row))
+                else:
+                    cells = [row[index] if index is not None and index < len(row) else "" for index in indexes]
+                try:
+                    product_name, data = parse_inventory_row(cells)
+                except ValueError as e:
+                    result.add_error(line_number, str(e))
+                    continue
+                result.products[product_name] = convert(data)
+            result.rows += len(batch)
+            if progress:
+                progress(result.rows)
+    return result
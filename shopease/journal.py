@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+from typing import Dict, Iterator
+from .catalog import Product, Shop, to_plain
+
+
+class Journal:
+    """Append-only log of catalog mutations, replayed on top of the shops snapshot."""
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        # Records not yet checkpointed, including those left by earlier sessions; a catalog
+        # loaded from the parse cache or a snapshot already has them applied, so skips replay()
+        self.pending = sum(1 for _ in self.records())
+        self._file = None
+
+    def append(self, record: Dict):
+        """Append one mutation record as a single compact JSON line."""
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, separators=(",", ":"), default=to_plain) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.pending += 1
+
+    def records(self) -> Iterator[Dict]:
+        """Yield the records in the journal, stopping at a torn final line."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                for line_number, line in enumerate(file, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.warning(f"Ignoring corrupt journal entry at line {line_number}")
+                        return
+        except FileNotFoundError:
+            return
+
+    def replay(self, shops: Dict) -> int:
+        """Apply every journaled mutation to shops and return how many were applied."""
+        applied = 0
+        for record in self.records():
+            apply_record(shops, record)
+            applied += 1
+        self.pending = applied
+        return applied
+
+    def truncate(self):
+        """Discard all records, typically right after a checkpoint."""
+        self.close()
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self.pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def apply_record(shops: Dict, record: Dict):
+    """Apply a single journal record to the shops dict."""
+    op = record["op"]
+    shop_name = record["shop"]
+    shop = shops.get(shop_name)
+    if shop is None:
+        logging.warning(f"Journal refers to unknown shop {shop_name!r}")
+        return
+    products = shop["Products"]
+    product_name = record["product"]
+    if op == "put":
+        products[product_name] = Product.from_dict(record["data"]) if isinstance(shop, Shop) else record["data"]
+    elif op == "patch":
+        if product_name in products:
+            products[product_name].update(record["data"])
+    elif op == "delete":
+        products.pop(product_name, None)
+    else:
+        logging.warning(f"Unknown journal operation {op!r}")
@@ -1,6 +1,7 @@
 import json
 import re
 from typing import Dict, List, Any
+from .service import CatalogService
 
 # Define the shops dictionary with initial data
 shops = {
@@ -54,6 +55,9 @@ shops = {
     }
 }
 
+# Searches share the indexes and result cache of the Tk UI; every change to shops is reported to it
+catalog = CatalogService(lambda: shops)
+
 # File paths for credentials
 USER_CREDENTIALS_FILE = "user_credentials.json"
 ADMIN_CREDENTIALS_FILE = "admin_credentials.json"
@@ -93,7 +97,7 @@ def validate_password(password: str) -> bool:
 
 def display_brands() -> None:
     """Display all available brands."""
-    brands = {brand for shop_data in shops.values() for brand in shop_data["Products"]}
+    brands = catalog.brand_counts()
     print("\nAvailable Brands:")
     print("-" * 40)
     for brand in sorted(brands):
@@ -105,31 +109,30 @@ def search_product(product_name: str) -> List[Dict[str, Any]]:
     return [
         {
             "Shop": shop,
-            "Location": shop_data["Location"],
+            "Location": shops[shop]["Location"],
             "stock": brand_data["stock"],
             "Price": brand_data["Price"],
             "Sizes": brand_data["Sizes"]
         }
-        for shop, shop_data in shops.items()
-        for brand, brand_data in shop_data["Products"].items()
-        if product_name.lower() == brand.lower()
+        for shop, brand, brand_data in catalog.find_products(name=product_name)
     ]
 
 def search_shop(shop_name: str) -> None:
     """Search for a specific shop and display its details."""
-    if shop_name in shops:
-        shop_data = shops[shop_name]
-        product_count = len(shop_data["Products"])
-        product_names = ", ".join(shop_data["Products"].keys())
+    details = catalog.shop_details(shop_name)
+    if details is not None:
         print("\nShop Details:")
         print("-" * 40)
         print(f"Shop: {shop_name}")
-        print(f"Location: {shop_data['Location']}")
-        print(f"Product Count: {product_count}")
-        print(f"Products: {product_names}")
+        print(f"Location: {details['Location']}")
+        print(f"Product Count: {len(details['Products'])}")
+        print(f"Products: {', '.join(details['Products'])}")
         print("-" * 40)
     else:
         print(f"\nShop '{shop_name}' not found.")
+        close_matches = [name for name, _ in catalog.fuzzy_shop_names(shop_name, 5)]
+        if close_matches:
+            print(f"Did you mean: {', '.join(close_matches)}?")
 
 def admin_signup() -> bool:
     """Handle admin signup process."""
@@ -256,6 +259,7 @@ def add_products() -> None:
                 "Price": price,
                 "Sizes": sizes_list
             }
+            catalog.product_changed(shop_name, product_name, shops[shop_name]["Products"][product_name])
             print(f"Product {product_name} added successfully!")
         except ValueError as e:
             print(f"Error: {e}")
@@ -271,6 +275,7 @@ def delete_product() -> None:
     product_name = input("Enter product name: ").strip()
     if product_name in shops[shop_name]["Products"]:
         del shops[shop_name]["Products"][product_name]
+        catalog.product_removed(shop_name, product_name)
         print("Product deleted successfully!")
     else:
         print("Product not found!")
@@ -319,6 +324,7 @@ def update_product() -> None:
                 break
             else:
                 print("Invalid choice!")
+            catalog.product_changed(shop_name, product_name, shops[shop_name]["Products"][product_name])
         except ValueError as e:
             print(f"Error: {e}")
 
@@ -420,15 +426,13 @@ def main() -> None:
                                 results = [
                                     {
                                         "Shop": shop,
-                                        "Location": shop_data["Location"],
+                                        "Location": shops[shop]["Location"],
                                         "Brand": brand,
                                         "stock": brand_data["stock"],
                                         "Price": brand_data["Price"],
                                         "Sizes": brand_data["Sizes"]
                                     }
-                                    for shop, shop_data in shops.items()
-                                    for brand, brand_data in shop_data["Products"].items()
-                                    if brand_data["Price"] <= max_price
+                                    for shop, brand, brand_data in catalog.find_by_price(max_price=max_price)
                                 ]
                                 
                                 if results:
@@ -0,0 +1,68 @@
+import hashlib
+import logging
+import os
+import pickle
+import stat
+from typing import Any, List, Optional, Tuple
+
+FileSignature = Tuple[str, Optional[int], Optional[int], Optional[str]]
+
+
+def file_signature(path: str) -> FileSignature:
+    """Return (path, mtime_ns, size, sha256) for path, with None fields if it is missing or empty."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return (path, None, None, None)
+    if info.st_size == 0 and stat.S_ISREG(info.st_mode):
+        # An empty journal or WAL file means the same as a missing one
+        return (path, None, None, None)
+    if stat.S_ISDIR(info.st_mode):
+        # Directories (such as the shard directory) are tracked by mtime alone
+        return (path, info.st_mtime_ns, None, None)
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return (path, info.st_mtime_ns, info.st_size, digest.hexdigest())
+
+
+class ParseCache:
+    """A pickle of an already-parsed catalog, valid only while its source files are unchanged.
+
+    The cache file holds two pickles: the signatures of the source files and
+    the parsed data, so a stale cache is rejected without unpickling the data.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, sources: List[str], tag: Any = None) -> Optional[Any]:
+        """Return the cached data if every source matches its recorded mtime, size and hash."""
+        try:
+            with open(self.path, "rb") as file:
+                header = pickle.load(file)
+                if header["tag"] != tag or header["sources"] != [file_signature(path) for path in sources]:
+                    return None
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError, TypeError) as e:
+            logging.warning(f"Ignoring unreadable parse cache {self.path}: {e}")
+            return None
+
+    def store(self, sources: List[str], data: Any, tag: Any = None):
+        """Cache data as the parsed form of the current contents of sources."""
+        header = {"tag": tag, "sources": [file_signature(path) for path in sources]}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_file = self.path + ".tmp"
+        with open(temp_file, "wb") as file:
+            pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self.path)
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,63 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class PriceIndex:
+    """Keys sorted by price, for range and top-k queries with bisect.
+
+    Prices live in a sorted array with a parallel array of keys; keys with equal
+    prices stay in the order they were added.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Hashable, float]] = ()):
+        pairs = sorted(items, key=lambda item: item[1])
+        self.keys: List[Hashable] = [key for key, _ in pairs]
+        self.prices: List[float] = [price for _, price in pairs]
+        self.price_of: Dict[Hashable, float] = dict(pairs)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: Hashable, price: float):
+        """Index key at price, moving it if it is already indexed at another price."""
+        old_price = self.price_of.get(key)
+        if old_price is not None:
+            if old_price == price:
+                return
+            self.remove(key)
+        position = bisect_right(self.prices, price)
+        self.prices.insert(position, price)
+        self.keys.insert(position, key)
+        self.price_of[key] = price
+
+    def remove(self, key: Hashable):
+        price = self.price_of.pop(key, None)
+        if price is None:
+            return
+        position = self.keys.index(key, bisect_left(self.prices, price), bisect_right(self.prices, price))
+        del self.prices[position]
+        del self.keys[position]
+
+    def bounds(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+               min_inclusive: bool = True, max_inclusive: bool = True) -> Tuple[int, int]:
+        """The slice of keys priced between min_price and max_price, which are included unless told otherwise."""
+        if min_price is None:
+            start = 0
+        else:
+            start = (bisect_left if min_inclusive else bisect_right)(self.prices, min_price)
+        if max_price is None:
+            end = len(self.prices)
+        else:
+            end = (bisect_right if max_inclusive else bisect_left)(self.prices, max_price)
+        return start, end
+
+    def range(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+              descending: bool = False, limit: Optional[int] = None) -> List[Hashable]:
+        """Keys priced within [min_price, max_price], cheapest or (descending) dearest first, at most limit."""
+        start, end = self.bounds(min_price, max_price)
+        if end <= start:
+            return []
+        if descending:
+            first = start if limit is None else max(start, end - limit)
+            return self.keys[first:end][::-1]
+        return self.keys[start:end if limit is None else min(end, start + limit)]
@@ -0,0 +1,295 @@
+import heapq
+import operator
+import re
+import shlex
+from collections.abc import Mapping
+from typing import Any, Callable, Hashable, Iterable, List, Optional, Set, Tuple
+from .search_index import ProductKey, SearchIndex, tokenize
+
+# A field term such as size:9, price<2000 or category:"Running Shoes"
+TERM_PATTERN = re.compile(r"^(\w+)(<=|>=|<|>|=|:)(.*)$", re.DOTALL)
+
+COMPARISONS = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "=": operator.eq, ":": operator.eq
+}
+
+
+class QueryError(ValueError):
+    """Raised for search text that cannot be parsed."""
+
+
+class Predicate:
+    """One condition of a query.
+
+    A plan asks every predicate for an estimate of how many products satisfy it,
+    then lists the candidates of the most selective one and checks the rest
+    against each candidate with matches(). estimate() is always called first, so
+    it resolves anything the other methods need from the indexes.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def estimate(self, index: SearchIndex, shops: Mapping) -> int:
+        raise NotImplementedError
+
+    def candidates(self, index: SearchIndex, shops: Mapping) -> Iterable[ProductKey]:
+        raise NotImplementedError
+
+    def matches(self, shop_name: str, product_name: str, data: Mapping) -> bool:
+        raise NotImplementedError
+
+
+class NamePredicate(Predicate):
+    """Product names containing every word, the last of which may be partly typed."""
+
+    def __init__(self, words: List[str]):
+        super().__init__(" ".join(words))
+        self.words = words
+
+    def estimate(self, index: SearchIndex, shops: Mapping) -> int:
+        postings = index.products.postings
+        sizes = [len(postings.get(word, ())) for word in self.words[:-1]]
+        sizes.append(sum(len(postings[token]) for token in index.products.tokens_with_prefix(self.words[-1])))
+        return min(sizes)
+
+    def candidates(self, index: SearchIndex, shops: Mapping) -> Iterable[ProductKey]:
+        return index.products.search(self.text)
+
+    def matches(self, shop_name: str, product_name: str, data: Mapping) -> bool:
+        tokens = set(tokenize(product_name))
+        last = self.words[-1]
+        return all(word in tokens for word in self.words[:-1]) and any(token.startswith(last) for token in tokens)
+
+
+class FacetPredicate(Predicate):
+    """Products with any of the given values of a facet, answered from its bitmaps."""
+
+    def __init__(self, text: str, facet: str, values: List[Hashable]):
+        super().__init__(text)
+        self.facet = facet
+        self.values = values
+        self.bitmap = 0
+
+    def estimate(self, index: SearchIndex, shops: Mapping) -> int:
+        if self.facet == "category":
+            # Categories are matched regardless of case
+            wanted = {value.lower() for value in self.values}
+            self.values = [value for value in index.facets.bitmaps["category"] if value.lower() in wanted]
+        self.bitmap = index.facets.select({self.facet: self.values})
+        return self.bitmap.bit_count()
+
+    def candidates(self, index: SearchIndex, shops: Mapping) -> Iterable[ProductKey]:
+        return index.facets.keys_of(self.bitmap)
+
+    def matches(self, shop_name: str, product_name: str, data: Mapping) -> bool:
+        # Reads just the one field rather than every facet value of the product
+        if self.facet == "size":
+            return any(size in self.values for size in data["Sizes"])
+        if self.facet == "category":
+            return data.get("Category", "Uncategorized") in self.values
+        return (data["stock"] > 0) in self.values
+
+
+class ShopPredicate(Predicate):
+    """Products of the shops named, or else of the shops whose names contain any of the given names' words."""
+
+    def __init__(self, text: str, names: List[str]):
+        super().__init__(text)
+        self.names = names
+        self.shop_names: Set[str] = set()
+
+    def estimate(self, index: SearchIndex, shops: Mapping) -> int:
+        for name in self.names:
+            # A full shop name picks that shop alone, not every shop whose name it begins
+            exact = [shop_name for shop_name in index.shops.search(name, prefix=False)
+                     if shop_name.lower() == name.lower()]
+            self.shop_names.update(exact or index.shops.search(name))
+        return sum(len(shops[shop_name]["Products"]) for shop_name in self.shop_names)
+
+    def candidates(self, index: SearchIndex, shops: Mapping) -> Iterable[ProductKey]:
+        return [(shop_name, product_name) for shop_name in self.shop_names for product_name in shops[shop_name]["Products"]]
+
+    def matches(self, shop_name: str, product_name: str, data: Mapping) -> bool:
+        return shop_name in self.shop_names
+
+
+class PricePredicate(Predicate):
+    """Products priced within a range, answered by bisecting the price index."""
+
+    def __init__(self, text: str, min_price: Optional[float] = None, max_price: Optional[float] = None,
+                 min_inclusive: bool = True, max_inclusive: bool = True):
+        super().__init__(text)
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_inclusive = min_inclusive
+        self.max_inclusive = max_inclusive
+        self.start = self.end = 0
+
+    def estimate(self, index: SearchIndex, shops: Mapping) -> int:
+        self.start, self.end = index.prices.bounds(self.min_price, self.max_price,
+                                                   self.min_inclusive, self.max_inclusive)
+        return max(self.end - self.start, 0)
+
+    def candidates(self, index: SearchIndex, shops: Mapping) -> Iterable[ProductKey]:
+        return index.prices.keys[self.start:self.end]
+
+    def matches(self, shop_name: str, product_name: str, data: Mapping) -> bool:
+        price = data["Price"]
+        if self.min_price is not None and (price < self.min_price or price == self.min_price and not self.min_inclusive):
+            return False
+        if self.max_price is not None and (price > self.max_price or price == self.max_price and not self.max_inclusive):
+            return False
+        return True
+
+
+class ScanPredicate(Predicate):
+    """A comparison on a field with no index, so it can only filter, or else scan the catalog."""
+
+    def __init__(self, text: str, field: str, compare: Callable[[Any, Any], bool], value: Any):
+        super().__init__(text)
+        self.field = field
+        self.compare = compare
+        self.value = value
+
+    def estimate(self, index: SearchIndex, shops: Mapping) -> int:
+        return len(index.facets.row_of)
+
+    def candidates(self, index: SearchIndex, shops: Mapping) -> Iterable[ProductKey]:
+        return index.facets.keys_of(index.facets.live)
+
+    def matches(self, shop_name: str, product_name: str, data: Mapping) -> bool:
+        return self.compare(data[self.field], self.value)
+
+
+class QueryResult:
+    """Outcome of a query: how many products matched, the first of them in catalog order, and the plan used."""
+
+    def __init__(self, query: "Query", total: int, matches: List[Tuple[str, str, Any]], plan: List[str]):
+        self.query = query
+        self.total = total
+        self.matches = matches
+        # Each step as "term (estimated products)", the first being the one whose candidates were scanned
+        self.plan = plan
+
+
+class Query:
+    """A parsed search: name words plus field predicates, all of which a product must satisfy."""
+
+    def __init__(self, words: List[str], predicates: List[Predicate]):
+        self.words = words
+        self.predicates = predicates
+
+    @property
+    def key(self) -> Tuple:
+        """Identifies the query regardless of the order of its field terms, e.g. for caching results."""
+        return tuple(self.words), tuple(sorted(predicate.text for predicate in self.predicates[bool(self.words):]))
+
+    @property
+    def is_plain(self) -> bool:
+        """Whether the query is only words, so it can be matched against shop names too."""
+        return bool(self.words) and len(self.predicates) == 1
+
+    def plan(self, index: SearchIndex, shops: Mapping) -> List[Tuple[int, Predicate]]:
+        """The predicates with their estimates, most selective first."""
+        return sorted(((predicate.estimate(index, shops), predicate) for predicate in self.predicates),
+                      key=lambda step: step[0])
+
+    def execute(self, index: SearchIndex, shops: Mapping, limit: Optional[int] = None) -> QueryResult:
+        plan = self.plan(index, shops)
+        described = [f"{predicate.text} (~{estimate})" for estimate, predicate in plan]
+        if not plan or plan[0][0] == 0:
+            return QueryResult(self, 0, [], described)
+
+        driver = plan[0][1]
+        filters = [predicate for _, predicate in plan[1:]]
+        found = []
+        for shop_name, product_name in driver.candidates(index, shops):
+            data = shops[shop_name]["Products"].get(product_name)
+            if data is not None and all(predicate.matches(shop_name, product_name, data) for predicate in filters):
+                found.append((shop_name, product_name, data))
+        order = index.products.order
+        if limit is None:
+            found.sort(key=lambda match: order[match[0], match[1]])
+            return QueryResult(self, len(found), found, described)
+        return QueryResult(self, len(found), heapq.nsmallest(limit, found, key=lambda match: order[match[0], match[1]]),
+                           described)
+
+
+def parse_number(field: str, text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        raise QueryError(f"{field} needs a number, not {text!r}")
+
+
+def parse_list(text: str) -> List[str]:
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def parse_term(text: str, field: str, op: str, value: str) -> Predicate:
+    if field in ("size", "sizes"):
+        if op != ":":
+            raise QueryError(f"Use {field}:VALUE for sizes")
+        sizes = [int(size) if size.isdigit() else size for size in parse_list(value)]
+        return FacetPredicate(text, "size", sizes)
+    if field in ("category", "cat"):
+        if op != ":":
+            raise QueryError(f"Use {field}:NAME for categories")
+        return FacetPredicate(text, "category", parse_list(value))
+    if field == "shop":
+        if op != ":":
+            raise QueryError("Use shop:NAME for shops")
+        return ShopPredicate(text, parse_list(value))
+    if field == "in" and value.lower() == "stock":
+        return FacetPredicate(text, "in_stock", [True])
+    if field == "price":
+        if op == ":" and ".." in value:
+            low, high = value.split("..", 1)
+            return PricePredicate(text, parse_number(field, low) if low else None,
+                                  parse_number(field, high) if high else None)
+        price = parse_number(field, value)
+        if op in ("<", "<="):
+            return PricePredicate(text, max_price=price, max_inclusive=op == "<=")
+        if op in (">", ">="):
+            return PricePredicate(text, min_price=price, min_inclusive=op == ">=")
+        return PricePredicate(text, price, price)
+    if field == "stock":
+        stock = parse_number(field, value)
+        # The in-stock bitmap answers the common cases
+        if (op == ">" and stock == 0) or (op == ">=" and stock == 1):
+            return FacetPredicate(text, "in_stock", [True])
+        if op in ("=", ":") and stock == 0:
+            return FacetPredicate(text, "in_stock", [False])
+        return ScanPredicate(text, "stock", COMPARISONS[op], stock)
+    raise QueryError(f"Unknown field {field!r}; use size, category, shop, price, stock or in:stock")
+
+
+def parse_query(text: str) -> Query:
+    """Parse search text such as `nike size:9 price<2000 category:Sneakers shop:Kobbler`.
+
+    Bare words must all appear in the product name. Field terms filter on size,
+    category, shop, price or stock; comma-separated values (size:8,9) match any
+    of them, and quotes keep spaces in a value (shop:"Yuvarani foot wears").
+    Raises QueryError if the text does not parse.
+    """
+    try:
+        parts = shlex.split(text)
+    except ValueError as e:
+        raise QueryError(str(e))
+
+    words = []
+    predicates: List[Predicate] = []
+    for part in parts:
+        match = TERM_PATTERN.match(part)
+        if match is None:
+            words += tokenize(part)
+            continue
+        field, op, value = match.groups()
+        value = value.strip()
+        if not value:
+            raise QueryError(f"Missing value after {field}{op}")
+        predicates.append(parse_term(part, field.lower(), op, value))
+    if words:
+        predicates.insert(0, NamePredicate(words))
+    return Query(words, predicates)
@@ -0,0 +1,59 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class ResultCache:
+    """LRU cache of search results, valid for a single catalog generation.
+
+    Callers pass the catalog's current generation with each lookup; once it
+    moves on, every entry is dropped, so a result is never served after the
+    catalog has changed. Hit and miss counts are logged every log_interval
+    lookups. Not thread-safe: callers hold the catalog lock.
+    """
+
+    def __init__(self, capacity: int, log_interval: int = 0):
+        self.capacity = capacity
+        self.log_interval = log_interval
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, generation: int, compute: Callable[[], Any]) -> Any:
+        """Return the cached result for key, or compute and cache it."""
+        if generation != self.generation:
+            if self.entries:
+                self.entries.clear()
+                self.invalidations += 1
+            self.generation = generation
+        try:
+            result = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            result = compute()
+            if self.capacity > 0:
+                self.entries[key] = result
+                if len(self.entries) > self.capacity:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        if self.log_interval and (self.hits + self.misses) % self.log_interval == 0:
+            logging.info(f"Query cache stats: {self.stats()}")
+        return result
+
+    def stats(self) -> Dict:
+        """Return hit and miss counts, the hit rate and how often entries were dropped."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,183 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class Column:
+    """A column of a ResultList: its heading, width in pixels, how to get its value from a row and how to show it."""
+
+    def __init__(self, heading: str, width: int, value: Callable[[Any], Any],
+                 format: Callable[[Any], str] = str):
+        self.heading = heading
+        self.width = width
+        self.value = value
+        self.format = format
+
+
+def sort_key(value: Any) -> Any:
+    """Order text case-insensitively and everything else as is."""
+    return value.lower() if isinstance(value, str) else value
+
+
+class ResultList(ttk.Frame):
+    """A table of results that only draws the rows currently in view.
+
+    The canvas holds one pool of text items per visible row, whatever the number
+    of results; scrolling re-labels the pool instead of creating or moving items,
+    so showing or scrolling 100k rows costs the same as 20. Clicking a heading
+    sorts by that column, and clicking it again reverses the order.
+    """
+
+    def __init__(self, parent, columns: Sequence[Column], colors: Dict[str, str],
+                 row_height: int = 24, font=("Roboto", 10)):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.colors = colors
+        self.row_height = row_height
+        self.font = font
+        self.rows: List[Any] = []
+        self.first = 0
+        self.sort_column: Optional[int] = None
+        self.sort_descending = False
+        # Canvas items reused for the visible rows: a stripe and one text item per column each
+        self.pool: List[tuple] = []
+        self.width = sum(column.width for column in self.columns)
+
+        self.header = tk.Canvas(self, height=row_height, bg=colors["primary"], highlightthickness=0)
+        self.canvas = tk.Canvas(self, bg=colors["input_bg"], highlightthickness=0, takefocus=True)
+        self.vertical = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.horizontal = ttk.Scrollbar(self, orient="horizontal", command=self.xview)
+        for canvas in (self.header, self.canvas):
+            canvas.configure(scrollregion=(0, 0, self.width, 0), xscrollcommand=self.horizontal.set)
+        self.header.grid(row=0, column=0, sticky="ew")
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.vertical.grid(row=1, column=1, sticky="ns")
+        self.horizontal.grid(row=2, column=0, sticky="ew")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self._draw_header()
+        self.header.bind("<Button-1>", self._on_header_click)
+        self.canvas.bind("<Configure>", lambda e: self._build_pool())
+        self.canvas.bind("<Button-1>", lambda e: self.canvas.focus_set())
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll_to(self.first - e.delta // 40))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll_to(self.first - 3))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll_to(self.first + 3))
+        self.canvas.bind("<Up>", lambda e: self.scroll_to(self.first - 1))
+        self.canvas.bind("<Down>", lambda e: self.scroll_to(self.first + 1))
+        self.canvas.bind("<Prior>", lambda e: self.yview("scroll", -1, "pages"))
+        self.canvas.bind("<Next>", lambda e: self.yview("scroll", 1, "pages"))
+        self.canvas.bind("<Home>", lambda e: self.scroll_to(0))
+        self.canvas.bind("<End>", lambda e: self.scroll_to(len(self.rows)))
+
+    def set_rows(self, rows: Sequence[Any]):
+        """Show rows, kept in the current sort order if a column has been sorted."""
+        self.rows = list(rows)
+        if self.sort_column is not None:
+            self._sort()
+        self.first = 0
+        self._refresh()
+
+    @property
+    def visible_rows(self) -> int:
+        """Rows that fit entirely in the canvas."""
+        return max(self.canvas.winfo_height() // self.row_height, 1)
+
+    def scroll_to(self, first: int):
+        self.first = max(min(first, len(self.rows) - self.visible_rows), 0)
+        self._refresh()
+
+    def yview(self, *args):
+        """Scrollbar callback: scrolls by row index, as the canvas only holds the visible rows."""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= max(self.visible_rows - 1, 1)
+            self.scroll_to(self.first + amount)
+
+    def xview(self, *args):
+        self.header.xview(*args)
+        self.canvas.xview(*args)
+
+    def _draw_header(self):
+        self.header.delete("all")
+        x = 0
+        for index, column in enumerate(self.columns):
+            heading = column.heading
+            if index == self.sort_column:
+                heading += " ▼" if self.sort_descending else " ▲"
+            self.header.create_text(x + 6, self.row_height // 2, text=heading, anchor="w",
+                                    fill="white", font=(self.font[0], self.font[1], "bold"))
+            x += column.width
+
+    def _on_header_click(self, event):
+        x = self.header.canvasx(event.x)
+        for index, column in enumerate(self.columns):
+            x -= column.width
+            if x < 0:
+                break
+        else:
+            return
+        if index == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column, self.sort_descending = index, False
+        self._sort()
+        self._draw_header()
+        self.scroll_to(0)
+
+    def _sort(self):
+        value = self.columns[self.sort_column].value
+        try:
+            self.rows.sort(key=lambda row: sort_key(value(row)), reverse=self.sort_descending)
+        except TypeError:
+            # Values of mixed types, e.g. sizes given both as numbers and as text
+            self.rows.sort(key=lambda row: str(value(row)), reverse=self.sort_descending)
+
+    def _build_pool(self):
+        """Create canvas items for as many rows as fit, once per resize rather than per scroll."""
+        wanted = self.visible_rows + 1
+        if len(self.pool) != wanted:
+            self.canvas.delete("all")
+            self.pool = []
+            for slot in range(wanted):
+                top = slot * self.row_height
+                stripe = self.canvas.create_rectangle(0, top, self.width, top + self.row_height, width=0)
+                cells = []
+                x = 0
+                for column in self.columns:
+                    cells.append(self.canvas.create_text(x + 6, top + self.row_height // 2, anchor="w",
+                                                         font=self.font, fill=self.colors["text"]))
+                    x += column.width
+                self.pool.append((stripe, cells))
+            self.canvas.configure(scrollregion=(0, 0, self.width, wanted * self.row_height))
+        self.scroll_to(self.first)
+
+    def _refresh(self):
+        """Label the pooled items with the rows now in view and update the scrollbar."""
+        for slot, (stripe, cells) in enumerate(self.pool):
+            index = self.first + slot
+            if index >= len(self.rows):
+                self.canvas.itemconfigure(stripe, state="hidden")
+                for cell in cells:
+                    self.canvas.itemconfigure(cell, state="hidden")
+                continue
+            row = self.rows[index]
+            fill = self.colors["input_bg"] if index % 2 == 0 else self.colors["background"]
+            self.canvas.itemconfigure(stripe, state="normal", fill=fill)
+            for cell, column in zip(cells, self.columns):
+                self.canvas.itemconfigure(cell, state="normal",
+                                          text=clip(column.format(column.value(row)), column.width))
+        total = len(self.rows)
+        if total:
+            self.vertical.set(self.first / total, min(self.first + self.visible_rows, total) / total)
+        else:
+            self.vertical.set(0, 1)
+
+
+def clip(text: str, width: int, char_width: int = 7) -> str:
+    """Shorten text to roughly fit width pixels, marking the cut with an ellipsis."""
+    limit = max((width - 12) // char_width, 1)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
@@ -0,0 +1,105 @@
+import functools
+import logging
+import time
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional
+from .config import SCREEN_CACHE_SIZE
+
+
+class Screen:
+    """A built screen: its frame, its buttons for keyboard navigation, where Back leads and how to refresh it."""
+
+    def __init__(self, name: str, frame: ttk.Frame):
+        self.name = name
+        self.frame = frame
+        self.buttons: List[ttk.Button] = []
+        self.back: Optional[Callable] = None
+        # Updates the screen's data-bound widgets when it is shown again
+        self.refresh: Optional[Callable[[], None]] = None
+
+
+class ScreenManager:
+    """Builds each screen once into its own frame and swaps frames with pack_forget/pack on navigation.
+
+    Up to capacity screens stay built, the least recently shown being destroyed
+    first; a capacity of 0 rebuilds every screen on every visit. Screens shown
+    with cache=False, such as forms holding a password, are always rebuilt.
+    How long each navigation takes is recorded per screen, split by whether the
+    screen was built or reused.
+    """
+
+    def __init__(self, parent, capacity: int = SCREEN_CACHE_SIZE):
+        self.parent = parent
+        self.capacity = capacity
+        self.screens: "OrderedDict[str, Screen]" = OrderedDict()
+        self.current: Optional[Screen] = None
+        self.previous: Optional[str] = None
+        self.timings: Dict[str, List[float]] = {}
+
+    def show(self, name: str, build: Callable[[Screen], None], cache: bool = True) -> Screen:
+        """Show the screen called name, calling build(screen) to fill its frame if it is not cached."""
+        start = time.perf_counter()
+        screen = self.screens.get(name)
+        if screen is not None and not screen.frame.winfo_exists():
+            del self.screens[name]
+            screen = None
+        if self.current is not None:
+            self.previous = self.current.name
+            self.current.frame.pack_forget()
+            if self.screens.get(self.current.name) is not self.current:
+                self.current.frame.destroy()
+        built = screen is None
+        if built:
+            screen = self.current = Screen(name, ttk.Frame(self.parent, style="Frame.TFrame"))
+            build(screen)
+            if cache and self.capacity > 0:
+                self.screens[name] = screen
+                self._evict()
+        else:
+            self.current = screen
+            self.screens.move_to_end(name)
+            if screen.refresh is not None:
+                screen.refresh()
+        screen.frame.pack(fill="both", expand=True)
+        self.timings.setdefault(f"{name} ({'built' if built else 'cached'})", []).append(time.perf_counter() - start)
+        return screen
+
+    def _evict(self):
+        while len(self.screens) > self.capacity:
+            _, screen = self.screens.popitem(last=False)
+            if screen is not self.current:
+                screen.frame.destroy()
+
+    def clear(self):
+        """Destroy every cached screen but the current one, e.g. after a theme change or logout."""
+        for screen in self.screens.values():
+            if screen is not self.current:
+                screen.frame.destroy()
+        self.screens.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Navigation count and median time in ms for each screen, built and cached separately."""
+        stats = {}
+        for key, samples in sorted(self.timings.items()):
+            ordered = sorted(samples)
+            stats[key] = {"count": len(ordered), "median_ms": round(ordered[len(ordered) // 2] * 1000, 2)}
+        return stats
+
+    def log_stats(self):
+        logging.info(f"Screen navigation stats: {self.stats()}")
+
+
+def screen(build: Optional[Callable] = None, *, cache: bool = True):
+    """Turn a ShopEaseUI method that builds a screen into a frame into one that navigates to it.
+
+    The method may return a callback that refreshes the screen's data-bound
+    widgets, run each time the cached screen is shown again.
+    """
+    if build is None:
+        return lambda build: screen(build, cache=cache)
+
+    @functools.wraps(build)
+    def show(ui):
+        ui.show_screen(build.__name__, lambda frame: build(ui, frame), cache)
+    return show
@@ -0,0 +1,198 @@
+import heapq
+import logging
+import re
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from .autocomplete import Autocomplete
+from .columnar import ColumnarCatalog
+from .facets import FacetIndex
+from .fuzzy import TrigramIndex
+from .price_index import PriceIndex
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+ProductKey = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-case word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TokenIndex:
+    """Inverted index from lower-case name tokens to the keys whose names contain them.
+
+    Keys are returned in the order they were added, so results follow catalog order.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[Hashable]] = {}
+        self.order: Dict[Hashable, int] = {}
+        self.counter = 0
+        # Sorted tokens for prefix lookups, built on first use and then kept up to date
+        self.vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.order
+
+    def add(self, key: Hashable, name: str):
+        """Index key under the tokens of name; re-adding a key is a no-op."""
+        if key in self.order:
+            return
+        self.order[key] = self.counter
+        self.counter += 1
+        for token in set(tokenize(name)):
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = set()
+                if self.vocabulary is not None:
+                    insort(self.vocabulary, token)
+            postings.add(key)
+
+    def remove(self, key: Hashable, name: str):
+        """Drop key, which must have been added with the same name."""
+        if self.order.pop(key, None) is None:
+            return
+        for token in set(tokenize(name)):
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(key)
+            if not postings:
+                del self.postings[token]
+                if self.vocabulary is not None:
+                    del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def tokens_with_prefix(self, prefix: str) -> List[str]:
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.postings)
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + "\U0010ffff", start)
+        return self.vocabulary[start:end]
+
+    def search(self, query: str, match_all: bool = True, prefix: bool = True,
+               limit: Optional[int] = None) -> List[Hashable]:
+        """Return the keys whose names contain all (or, with match_all False, any) of the query's tokens.
+
+        With prefix set, the last query token also matches longer tokens it begins,
+        so a partly typed word still finds results. limit keeps only the first keys.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        matches = [self.postings.get(token, set()) for token in tokens[:-1]]
+        if prefix:
+            expansions = [self.postings[token] for token in self.tokens_with_prefix(tokens[-1])]
+            matches.append(expansions[0] if len(expansions) == 1 else set().union(*expansions))
+        else:
+            matches.append(self.postings.get(tokens[-1], set()))
+
+        # The posting sets themselves must not be modified, so a single one is used as is
+        if len(matches) == 1:
+            result = matches[0]
+        elif match_all:
+            matches.sort(key=len)
+            result = matches[0] & matches[1]
+            for postings in matches[2:]:
+                if not result:
+                    break
+                result &= postings
+        else:
+            result = set().union(*matches)
+        if limit is not None:
+            return heapq.nsmallest(limit, result, key=self.order.__getitem__)
+        return sorted(result, key=self.order.__getitem__)
+
+
+class SearchIndex:
+    """Token indexes and prefix completions over product names, keyed by (shop, product), and shop names,
+    plus price and facet indexes over the products and, optionally, a columnar mirror of them."""
+
+    def __init__(self):
+        self.products = TokenIndex()
+        self.shops = TokenIndex()
+        self.product_names = Autocomplete()
+        self.shop_names = Autocomplete()
+        self.prices = PriceIndex()
+        self.facets = FacetIndex()
+        # NumPy columns for vectorized filters and aggregates, when enabled and numpy is installed
+        self.columns: Optional[ColumnarCatalog] = None
+        # Typo-tolerant name lookups, built on first use
+        self._fuzzy_products: Optional[TrigramIndex] = None
+        self._fuzzy_shops: Optional[TrigramIndex] = None
+
+    @property
+    def fuzzy_products(self) -> TrigramIndex:
+        if self._fuzzy_products is None:
+            self._fuzzy_products = TrigramIndex(self.product_names.counts)
+        return self._fuzzy_products
+
+    @property
+    def fuzzy_shops(self) -> TrigramIndex:
+        if self._fuzzy_shops is None:
+            self._fuzzy_shops = TrigramIndex(self.shop_names.counts)
+        return self._fuzzy_shops
+
+    @classmethod
+    def build(cls, shops: Mapping, columnar: bool = False) -> "SearchIndex":
+        index = cls()
+        products = []
+        for shop_name, shop_data in shops.items():
+            index.shops.add(shop_name, shop_name)
+            for product_name, data in shop_data["Products"].items():
+                index.products.add((shop_name, product_name), product_name)
+                products.append(((shop_name, product_name), data))
+        # Sorting once is much cheaper than inserting names one at a time
+        index.product_names = Autocomplete(product for _, product in index.products.order)
+        index.shop_names = Autocomplete(index.shops.order)
+        index.prices = PriceIndex((key, data["Price"]) for key, data in products)
+        index.facets = FacetIndex.build(products)
+        if columnar:
+            try:
+                index.columns = ColumnarCatalog.build(products)
+            except ValueError as e:
+                logging.warning(f"Columnar engine disabled: {e}")
+        return index
+
+    def add_shop(self, shop_name: str, shop_data: Mapping):
+        if shop_name not in self.shops:
+            self.shops.add(shop_name, shop_name)
+            self.shop_names.add(shop_name)
+            if self._fuzzy_shops is not None:
+                self._fuzzy_shops.add(shop_name)
+        for product_name, data in shop_data["Products"].items():
+            self.add_product(shop_name, product_name, data)
+
+    def add_product(self, shop_name: str, product_name: str, data: Mapping):
+        """Index a new product, or re-index the price and facets of a replaced or updated one."""
+        key = (shop_name, product_name)
+        if key not in self.products:
+            self.products.add(key, product_name)
+            self.product_names.add(product_name)
+            # The fuzzy index holds each distinct name once
+            if self._fuzzy_products is not None and self.product_names.counts[product_name] == 1:
+                self._fuzzy_products.add(product_name)
+        self.prices.add(key, data["Price"])
+        self.facets.add(key, data)
+        if self.columns is not None:
+            try:
+                self.columns.add(key, data)
+            except ValueError as e:
+                logging.warning(f"Columnar engine disabled: {e}")
+                self.columns = None
+
+    def remove_product(self, shop_name: str, product_name: str):
+        key = (shop_name, product_name)
+        if key in self.products:
+            self.products.remove(key, product_name)
+            self.product_names.remove(product_name)
+            if self._fuzzy_products is not None and product_name not in self.product_names.counts:
+                self._fuzzy_products.remove(product_name)
+        self.prices.remove(key)
+        self.facets.remove(key)
+        if self.columns is not None:
+            self.columns.remove(key)
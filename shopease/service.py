@@ -0,0 +1,334 @@
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from .config import (
+    SUGGESTION_LIMIT, SUGGESTION_ORDER, FACET_RESULT_LIMIT, QUERY_RESULT_LIMIT, QUERY_CACHE_SIZE,
+    QUERY_CACHE_LOG_INTERVAL, COLUMNAR_ENGINE
+)
+from . import columnar
+from .facets import FACETS, FacetResult
+from .result_cache import ResultCache
+from .search_index import SearchIndex, tokenize
+
+if TYPE_CHECKING:
+    from .query import QueryResult
+
+# (shop name, product name, product data) triples returned by the product searches
+ProductMatch = Tuple[str, str, Dict]
+
+
+class CatalogService:
+    """Indexing, result caching and search over a catalog in the shops.json layout, with no UI attached.
+
+    The catalog is read through get_shops, so its owner may swap in a new dict
+    at any time; whoever changes it must report each change (product_changed,
+    product_removed, shops_added or reset) while holding lock. The Tk UI, the
+    console front end and the benchmarks all search through this class.
+    """
+
+    def __init__(self, get_shops: Callable[[], Mapping], lock: Optional[threading.RLock] = None,
+                 columnar_engine: bool = COLUMNAR_ENGINE, indexed_store: Optional[Callable[[], Any]] = None):
+        self.get_shops = get_shops
+        # Returns the storage backend when it can answer name and price lookups from its own
+        # indexes and holds every change to the catalog, otherwise None; called under lock
+        self.indexed_store = indexed_store
+        self.lock = lock or threading.RLock()
+        self.columnar_engine = columnar_engine and columnar.available()
+        self._search_index: Optional[SearchIndex] = None
+        self._builder: Optional[threading.Thread] = None
+        # Set by the first build_in_background(); later resets then rebuild in the background too
+        self.background_builds = False
+        # Bumped on every change to the catalog, which invalidates cached search results
+        self.generation = 0
+        self.query_cache = ResultCache(QUERY_CACHE_SIZE, QUERY_CACHE_LOG_INTERVAL)
+
+    @property
+    def shops(self) -> Mapping:
+        return self.get_shops()
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """The indexes over product and shop names, prices and facets, built on first use."""
+        with self.lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex.build(self.shops, self.columnar_engine)
+            return self._search_index
+
+    def build_in_background(self):
+        """Start building the indexes on a worker thread unless they are built, or being built, already.
+
+        The lock is only held to copy the product lists and to install the result,
+        so searches and edits carry on meanwhile; a search that arrives first
+        builds the indexes itself, as before.
+        """
+        with self.lock:
+            self.background_builds = True
+            if self._search_index is not None or self._builder is not None:
+                return
+            self._builder = threading.Thread(target=self._build, name="shopease-indexer", daemon=True)
+            self._builder.start()
+
+    def _build(self, attempts: int = 3):
+        try:
+            for _ in range(attempts):
+                with self.lock:
+                    if self._search_index is not None:
+                        return
+                    generation = self.generation
+                    shops = {shop_name: {"Products": dict(shop_data["Products"])}
+                             for shop_name, shop_data in self.shops.items()}
+                started = time.perf_counter()
+                index = SearchIndex.build(shops, self.columnar_engine)
+                with self.lock:
+                    # A change during the build may be missing from the copy, so the index is built again
+                    if self.generation != generation:
+                        continue
+                    if self._search_index is None:
+                        self._search_index = index
+                        logging.info(f"Built search indexes in the background in "
+                                     f"{(time.perf_counter() - started) * 1000:.1f} ms")
+                    return
+            logging.info("Catalog kept changing; search indexes left to be built on first use")
+        finally:
+            with self.lock:
+                self._builder = None
+
+    def product_changed(self, shop_name: str, product_name: str, data: Mapping):
+        """Report a product that was added, replaced or updated in place."""
+        with self.lock:
+            self.generation += 1
+            if self._search_index is not None:
+                self._search_index.add_product(shop_name, product_name, data)
+
+    def product_removed(self, shop_name: str, product_name: str):
+        with self.lock:
+            self.generation += 1
+            if self._search_index is not None:
+                self._search_index.remove_product(shop_name, product_name)
+
+    def shops_added(self, shops: Mapping):
+        """Report whole shops that were added to the catalog, e.g. while it streams in."""
+        with self.lock:
+            self.generation += 1
+            if self._search_index is not None:
+                for shop_name, shop_data in shops.items():
+                    self._search_index.add_shop(shop_name, shop_data)
+
+    def reset(self):
+        """Report changes made without notice, e.g. a journal replay; the indexes are rebuilt on next use."""
+        with self.lock:
+            self._search_index = None
+            self.generation += 1
+            if self.background_builds:
+                self.build_in_background()
+
+    def log_stats(self):
+        logging.info(f"Query cache stats: {self.query_cache.stats()}")
+
+    def _cached(self, key: Hashable, search: Callable[[], Any]) -> Any:
+        """Run search, or return its result from the query cache if the catalog is unchanged since."""
+        with self.lock:
+            return self.query_cache.get(key, self.generation, search)
+
+    def search_products(self, query: str, match_all: bool = True, prefix: bool = True) -> List[ProductMatch]:
+        """Find products whose names contain all (or any) of the query's words, in catalog order.
+
+        With prefix set, the last word also matches longer words, as while typing.
+        """
+        def search():
+            matches = []
+            shops = self.shops
+            for shop_name, product_name in self.search_index.products.search(query, match_all, prefix):
+                data = shops[shop_name]["Products"].get(product_name)
+                if data is not None:
+                    matches.append((shop_name, product_name, data))
+            return matches
+
+        # Queries with the same words, whatever their case or punctuation, share an entry
+        return list(self._cached(("products", tuple(tokenize(query)), match_all, prefix), search))
+
+    def search_shops(self, query: str) -> List[str]:
+        """Find shops whose names contain the query's words; the last word may be partly typed."""
+        with self.lock:
+            return self.search_index.shops.search(query)
+
+    def shop_details(self, shop_name: str) -> Optional[Dict]:
+        """The location and products of a shop, or None if there is no shop of that name."""
+        with self.lock:
+            shop_data = self.shops.get(shop_name)
+            if shop_data is None:
+                return None
+            return {"Shop": shop_name, "Location": shop_data["Location"], "Products": list(shop_data["Products"])}
+
+    def complete_products(self, prefix: str, limit: int = SUGGESTION_LIMIT) -> List[str]:
+        """Product names starting with prefix, then names with a word starting with it, up to limit."""
+        with self.lock:
+            index = self.search_index
+            names = index.product_names.complete(prefix, limit, SUGGESTION_ORDER == "popularity")
+            if len(names) < limit:
+                seen = set(names)
+                # A product name may be carried by several shops, so fetch extra postings
+                for _, product_name in index.products.search(prefix, limit=limit * 4):
+                    if product_name not in seen:
+                        seen.add(product_name)
+                        names.append(product_name)
+                        if len(names) == limit:
+                            break
+            return names
+
+    def complete_shops(self, prefix: str, limit: int = SUGGESTION_LIMIT) -> List[str]:
+        """Shop names starting with prefix, then shops with a word starting with it, up to limit."""
+        with self.lock:
+            index = self.search_index
+            names = index.shop_names.complete(prefix, limit)
+            names += [shop_name for shop_name in index.shops.search(prefix, limit=limit) if shop_name not in names]
+            return names[:limit]
+
+    def fuzzy_product_names(self, query: str, limit: int = SUGGESTION_LIMIT) -> List[Tuple[str, int]]:
+        """Product names within a few typos of query as (name, edit distance), closest first."""
+        with self.lock:
+            return self.search_index.fuzzy_products.search(query, limit)
+
+    def fuzzy_shop_names(self, query: str, limit: int = SUGGESTION_LIMIT) -> List[Tuple[str, int]]:
+        """Shop names within a few typos of query as (name, edit distance), closest first."""
+        with self.lock:
+            return self.search_index.fuzzy_shops.search(query, limit)
+
+    def _from_store(self, key: Hashable, query: Callable[[Any], List[Tuple[str, str]]]) -> Optional[List[ProductMatch]]:
+        """Run query(store) against the indexed store, or return None if there is none to use."""
+        with self.lock:
+            store = self.indexed_store() if self.indexed_store else None
+            if store is None:
+                return None
+
+            def search():
+                shops = self.shops
+                return [(shop_name, product_name, shops[shop_name]["Products"][product_name])
+                        for shop_name, product_name in query(store)]
+
+            return list(self._cached(("store",) + key, search))
+
+    def find_products(self, name: Optional[str] = None, max_price: Optional[float] = None) -> List[ProductMatch]:
+        """Find products by exact (case-insensitive) name and/or maximum price."""
+        matches = self._from_store(("find", name, max_price),
+                                   lambda store: store.find_products(name=name, max_price=max_price))
+        if matches is not None:
+            return matches
+        if name is None and max_price is not None:
+            return self.find_by_price(max_price=max_price)
+        if name is None or not tokenize(name):
+            # Nothing the indexes can look up, so scan
+            name = name.lower() if name is not None else None
+            with self.lock:
+                return [
+                    (shop_name, product_name, data)
+                    for shop_name, shop_data in self.shops.items()
+                    for product_name, data in shop_data["Products"].items()
+                    if (name is None or product_name.lower() == name)
+                    and (max_price is None or data["Price"] <= max_price)
+                ]
+        name = name.lower()
+        return [
+            (shop_name, product_name, data)
+            for shop_name, product_name, data in self.search_products(name, prefix=False)
+            if product_name.lower() == name and (max_price is None or data["Price"] <= max_price)
+        ]
+
+    def find_by_price(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+                      descending: bool = False, limit: Optional[int] = None, in_stock: bool = False) -> List[ProductMatch]:
+        """Products priced within [min_price, max_price], cheapest (or dearest) first, at most limit.
+
+        With in_stock set, products with no stock are skipped.
+        """
+        matches = self._from_store(
+            ("price", min_price, max_price, descending, limit, in_stock),
+            lambda store: store.find_products(min_price=min_price, max_price=max_price, by_price=True,
+                                              descending=descending, limit=limit, in_stock=in_stock))
+        if matches is not None:
+            return matches
+
+        def search():
+            index = self.search_index
+            if in_stock and limit is not None and index.columns is not None:
+                # A vectorized filter and partial sort beats walking the price index past products out of stock
+                columns = index.columns
+                rows = columns.sort_by_price(columns.select(min_price, max_price, in_stock=True), descending, limit)
+                keys = columns.keys_of(rows)
+            else:
+                keys = index.prices.range(min_price, max_price, descending, None if in_stock else limit)
+            matches = []
+            shops = self.shops
+            for shop_name, product_name in keys:
+                data = shops[shop_name]["Products"][product_name]
+                if in_stock and data["stock"] <= 0:
+                    continue
+                matches.append((shop_name, product_name, data))
+                if len(matches) == limit:
+                    break
+            return matches
+
+        return list(self._cached(("price", min_price, max_price, descending, limit, in_stock), search))
+
+    def brand_counts(self) -> Dict[str, int]:
+        """How many shops carry each brand."""
+        def count():
+            columns = self.search_index.columns
+            if columns is not None:
+                return columns.brand_counts()
+            return dict(Counter(product_name for shop_data in self.shops.values() for product_name in shop_data["Products"]))
+
+        return dict(self._cached(("brands",), count))
+
+    def facet_search(self, query: str = "", categories: Iterable[str] = (), sizes: Iterable = (),
+                     in_stock: bool = False, shop_names: Iterable[str] = (), min_price: Optional[float] = None,
+                     max_price: Optional[float] = None, limit: int = FACET_RESULT_LIMIT) -> FacetResult:
+        """Products matching every given filter (and any of the values given for each), with facet counts.
+
+        query matches name words as in search_products. Only the first limit matches
+        are returned, but the counts cover them all.
+        """
+        filters = {}
+        if categories:
+            filters["category"] = list(categories)
+        if sizes:
+            filters["size"] = list(sizes)
+        if in_stock:
+            filters["in_stock"] = [True]
+        shop_names = list(shop_names)
+        with self.lock:
+            shops = self.shops
+            index = self.search_index
+            facets = index.facets
+            bitmap = facets.select(filters)
+            if bitmap and tokenize(query):
+                bitmap &= facets.bitmap_for(index.products.search(query))
+            if bitmap and shop_names:
+                bitmap &= facets.bitmap_for(
+                    (shop_name, product_name)
+                    for shop_name in shop_names if shop_name in shops
+                    for product_name in shops[shop_name]["Products"]
+                )
+            if bitmap and (min_price is not None or max_price is not None):
+                bitmap &= facets.bitmap_for(index.prices.range(min_price, max_price))
+
+            keys = facets.keys_of(bitmap)
+            counts = {facet: facets.counts(bitmap, facet) for facet in FACETS}
+            counts["shop"] = dict(Counter(shop_name for shop_name, _ in keys))
+            matches = [
+                (shop_name, product_name, shops[shop_name]["Products"][product_name])
+                for shop_name, product_name in keys[:limit]
+            ]
+        return FacetResult(len(keys), matches, counts)
+
+    def run_query(self, text: str, limit: Optional[int] = QUERY_RESULT_LIMIT) -> "QueryResult":
+        """Run a search-bar query such as `nike size:9 price<2000` (see parse_query).
+
+        Raises QueryError if the text does not parse.
+        """
+        # The query language is only loaded once something is searched for
+        from .query import parse_query
+        query = parse_query(text)
+        return self._cached(("query", query.key, limit), lambda: query.execute(self.search_index, self.shops, limit))
@@ -0,0 +1,206 @@
+"""Binary, memory-mapped catalog snapshots.
+
+Layout (little-endian):
+
+    header    magic, version, shop/product/string counts, section offsets
+    strings   (string_count + 1) uint32 offsets followed by the UTF-8 blob
+    shops     name id, location id, first product, product count
+    products  name id, category id, flags, stock, price, sizes bitmask
+
+The shop table is only read, and shops only decoded, when they are first
+needed, so opening a snapshot costs the same regardless of its size.
+"""
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterator, List, Optional
+from .catalog import Product, Shop, encode_sizes
+
+MAGIC = b"SHPSNAP1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIQQQ")
+OFFSET = struct.Struct("<I")
+SHOP = struct.Struct("<IIII")
+PRODUCT = struct.Struct("<IIIIqdQ")
+NO_STRING = 0xFFFFFFFF
+FLAG_FLOAT_PRICE = 1
+
+
+class SnapshotError(ValueError):
+    """Raised when a catalog cannot be stored in, or read from, a snapshot."""
+
+
+def write_snapshot(path: str, shops: Mapping):
+    """Write shops to a binary snapshot, atomically replacing any existing one."""
+    strings: Dict[str, int] = {}
+
+    def string_id(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    shop_rows = bytearray()
+    product_rows = bytearray()
+    product_count = 0
+    for shop_name, shop_data in shops.items():
+        products = shop_data["Products"]
+        shop_rows += SHOP.pack(string_id(shop_name), string_id(shop_data["Location"]), product_count, len(products))
+        for product_name, data in products.items():
+            if set(data) - {"stock", "Price", "Sizes", "Category"}:
+                raise SnapshotError(f"Product {product_name!r} has fields the snapshot cannot store")
+            sizes = encode_sizes(data["Sizes"])
+            if not isinstance(sizes, int):
+                raise SnapshotError(f"Product {product_name!r} has sizes the snapshot cannot store")
+            price = data["Price"]
+            category = data.get("Category")
+            try:
+                product_rows += PRODUCT.pack(
+                    string_id(product_name),
+                    string_id(category) if category is not None else NO_STRING,
+                    FLAG_FLOAT_PRICE if isinstance(price, float) else 0,
+                    0,
+                    data["stock"],
+                    price,
+                    sizes,
+                )
+            except struct.error as e:
+                raise SnapshotError(f"Product {product_name!r} cannot be stored: {e}") from e
+            product_count += 1
+
+    blob = bytearray()
+    offsets = bytearray()
+    for value in strings:
+        offsets += OFFSET.pack(len(blob))
+        blob += value.encode("utf-8")
+    offsets += OFFSET.pack(len(blob))
+
+    strings_offset = HEADER.size
+    shops_offset = strings_offset + len(offsets) + len(blob)
+    products_offset = shops_offset + len(shop_rows)
+    header = HEADER.pack(MAGIC, VERSION, len(shop_rows) // SHOP.size, product_count, len(strings),
+                         strings_offset, shops_offset, products_offset)
+
+    temp_file = path + ".tmp"
+    with open(temp_file, "wb") as file:
+        file.write(header)
+        file.write(offsets)
+        file.write(blob)
+        file.write(shop_rows)
+        file.write(product_rows)
+    os.replace(temp_file, path)
+
+
+class SnapshotShops(MutableMapping):
+    """A shops mapping backed by a memory-mapped snapshot.
+
+    Each shop is decoded into Shop and Product records on first access and
+    cached, so edits made through the mapping behave as they would on a dict.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.shop_count, self.product_count, self.string_count,
+             self.strings_offset, self.shops_offset, self.products_offset) = HEADER.unpack_from(self.buffer)
+        except struct.error as e:
+            self.buffer.close()
+            raise SnapshotError(f"Truncated snapshot {path}") from e
+        if magic != MAGIC or version != VERSION:
+            self.buffer.close()
+            raise SnapshotError(f"{path} is not a version {VERSION} catalog snapshot")
+        self.blob_offset = self.strings_offset + (self.string_count + 1) * OFFSET.size
+        # Shop names in order and their rows in the shop table, read by _read_shop_table()
+        self._order: Optional[List[str]] = None
+        self._rows: Optional[Dict[str, int]] = None
+        self.loaded: Dict[str, Shop] = {}
+
+    @property
+    def order(self) -> List[str]:
+        if self._order is None:
+            self._read_shop_table()
+        return self._order
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        if self._rows is None:
+            self._read_shop_table()
+        return self._rows
+
+    def _read_shop_table(self):
+        order = []
+        rows = {}
+        for row in range(self.shop_count):
+            name = self.string(SHOP.unpack_from(self.buffer, self.shops_offset + row * SHOP.size)[0])
+            order.append(name)
+            rows[name] = row
+        self._order, self._rows = order, rows
+
+    def string(self, string_id: int) -> str:
+        start, end = struct.unpack_from("<II", self.buffer, self.strings_offset + string_id * OFFSET.size)
+        return self.buffer[self.blob_offset + start:self.blob_offset + end].decode("utf-8")
+
+    def _decode_shop(self, row: int) -> Shop:
+        _, location_id, first, count = SHOP.unpack_from(self.buffer, self.shops_offset + row * SHOP.size)
+        products = {}
+        offset = self.products_offset + first * PRODUCT.size
+        for _ in range(count):
+            name_id, category_id, flags, _, stock, price, sizes = PRODUCT.unpack_from(self.buffer, offset)
+            product = Product(stock, price if flags & FLAG_FLOAT_PRICE else int(price),
+                              category=self.string(category_id) if category_id != NO_STRING else None)
+            product.sizes = sizes
+            products[self.string(name_id)] = product
+            offset += PRODUCT.size
+        return Shop(self.string(location_id), products)
+
+    def __getitem__(self, shop_name: str) -> Shop:
+        shop = self.loaded.get(shop_name)
+        if shop is None:
+            shop = self._decode_shop(self.rows[shop_name])
+            self.loaded[shop_name] = shop
+        return shop
+
+    def __setitem__(self, shop_name: str, shop_data):
+        if shop_name not in self.rows:
+            self.order.append(shop_name)
+            self.rows[shop_name] = -1
+        self.loaded[shop_name] = Shop.from_dict(shop_data)
+
+    def __delitem__(self, shop_name: str):
+        del self.rows[shop_name]
+        self.order.remove(shop_name)
+        self.loaded.pop(shop_name, None)
+
+    def __contains__(self, shop_name) -> bool:
+        return shop_name in self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.order))
+
+    def __len__(self) -> int:
+        return self.shop_count if self._order is None else len(self._order)
+
+    def close(self):
+        self.buffer.close()
+
+
+def open_snapshot(path: str, source_files: List[str]) -> Optional[SnapshotShops]:
+    """Open the snapshot at path unless it is missing, unreadable or older than any source file."""
+    try:
+        snapshot_mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    for source in source_files:
+        try:
+            if os.path.getmtime(source) > snapshot_mtime:
+                return None
+        except OSError:
+            continue
+    try:
+        return SnapshotShops(path)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring catalog snapshot: {e}")
+        return None
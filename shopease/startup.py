@@ -0,0 +1,150 @@
+import importlib.abc
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from .config import STARTUP_BUDGET_MS
+
+
+class TimedLoader:
+    """Wraps a module's loader so that the ImportTimer sees how long the module takes to run."""
+
+    def __init__(self, loader, name: str, timer: "ImportTimer"):
+        self.loader = loader
+        self.name = name
+        self.timer = timer
+
+    def create_module(self, spec):
+        create = getattr(self.loader, "create_module", None)
+        # Extension modules do most of their work here
+        return self.timer.timed(self.name, create, spec) if create else None
+
+    def exec_module(self, module):
+        self.timer.timed(self.name, self.loader.exec_module, module)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Times every module imported while installed, in the manner of python -X importtime.
+
+    Each module gets a cumulative time, including the imports it triggers, and
+    its own time without them.
+    """
+
+    def __init__(self):
+        self.cumulative: Dict[str, float] = {}
+        self.own: Dict[str, float] = {}
+        # Time spent in nested imports, one entry per module being imported, kept per thread
+        self.local = threading.local()
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = TimedLoader(spec.loader, name, self)
+                return spec
+        return None
+
+    def timed(self, name: str, func, *args):
+        stack = self.local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            self.cumulative[name] = self.cumulative.get(name, 0.0) + elapsed
+            self.own[name] = self.own.get(name, 0.0) + elapsed - nested
+            if stack:
+                stack[-1] += elapsed
+
+    def slowest(self, count: int) -> List[Tuple[str, float, float]]:
+        """(module, cumulative seconds, own seconds) for the count slowest modules."""
+        ranked = sorted(self.cumulative.items(), key=lambda item: -item[1])[:count]
+        return [(name, total, self.own[name]) for name, total in ranked]
+
+
+class StartupProfile:
+    """Times the steps of starting ShopEase and checks the first frame against STARTUP_BUDGET_MS.
+
+    The time to the first interactive frame, the window and splash drawn, is
+    logged on every start, as a warning when over budget. In verbose mode the
+    imports are timed as well, and a breakdown is printed once the main menu
+    is ready.
+    """
+
+    def __init__(self, verbose: bool = False, budget_ms: float = STARTUP_BUDGET_MS):
+        self.started = time.perf_counter()
+        self.verbose = verbose
+        self.budget_ms = budget_ms
+        self.steps: List[Tuple[str, float]] = []
+        self.first_frame_ms: Optional[float] = None
+        self.ready_ms: Optional[float] = None
+        self.import_timer = ImportTimer() if verbose else None
+        if self.import_timer:
+            self.import_timer.install()
+
+    @property
+    def over_budget(self) -> bool:
+        return self.first_frame_ms is not None and self.first_frame_ms > self.budget_ms
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @contextmanager
+    def step(self, label: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, time.perf_counter() - start))
+
+    def first_frame(self, root):
+        """Call from root.after_idle once the window is set up, so pending drawing is flushed first."""
+        root.update_idletasks()
+        self.first_frame_ms = self.elapsed_ms()
+        message = f"Startup: first frame in {self.first_frame_ms:.0f} ms (budget {self.budget_ms:.0f} ms)"
+        if self.over_budget:
+            logging.warning(message)
+        else:
+            logging.info(message)
+
+    def ready(self, root):
+        """Call once the main menu is shown; in verbose mode this prints the report and quits."""
+        self.ready_ms = self.elapsed_ms()
+        logging.info(f"Startup: main menu ready in {self.ready_ms:.0f} ms")
+        if self.verbose:
+            if self.import_timer:
+                self.import_timer.uninstall()
+            print(self.report())
+            root.quit()
+
+    def report(self, import_count: int = 15) -> str:
+        lines = ["Startup steps:"]
+        lines += [f"  {label:<32} {seconds * 1000:8.1f} ms" for label, seconds in self.steps]
+        if self.import_timer:
+            lines.append("Slowest imports (cumulative / own):")
+            lines += [f"  {name:<32} {total * 1000:8.1f} ms {own * 1000:8.1f} ms"
+                      for name, total, own in self.import_timer.slowest(import_count)]
+        if self.first_frame_ms is not None:
+            verdict = "OVER BUDGET" if self.over_budget else "within budget"
+            lines.append(f"First interactive frame: {self.first_frame_ms:.0f} ms "
+                         f"(budget {self.budget_ms:.0f} ms, {verdict})")
+        if self.ready_ms is not None:
+            lines.append(f"Main menu ready (data loaded): {self.ready_ms:.0f} ms")
+        return "\n".join(lines)
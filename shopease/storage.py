@@ -0,0 +1,406 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from .config import (
+    USER_CREDENTIALS_FILE, ADMIN_CREDENTIALS_FILE, SHOPS_FILE, JOURNAL_FILE, SQLITE_FILE, SHARDS_DIR,
+    JOURNAL_ENABLED, JOURNAL_CHECKPOINT_INTERVAL, JOURNAL_FSYNC, SHARD_LOAD_WORKERS
+)
+from .catalog import to_plain
+from .journal import Journal
+from .streaming import iter_json_object
+
+
+def read_json(path: str) -> Optional[Dict]:
+    """Read a JSON file, returning None if it is missing or corrupt."""
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_json(path: str, data: Dict):
+    """Write a JSON file atomically via a temporary file and rename."""
+    temp_file = path + ".tmp"
+    with open(temp_file, "w") as file:
+        json.dump(data, file, indent=4, default=to_plain)
+    os.replace(temp_file, path)
+
+
+class JsonBackend:
+    """Stores shops and credentials in the JSON files, journaling product changes."""
+
+    def __init__(self, shops_file: str = SHOPS_FILE, admin_file: str = ADMIN_CREDENTIALS_FILE,
+                 users_file: str = USER_CREDENTIALS_FILE, journal_file: Optional[str] = JOURNAL_FILE):
+        self.shops_file = shops_file
+        self.credential_files = {"admin": admin_file, "users": users_file}
+        self.journal = Journal(journal_file, fsync=JOURNAL_FSYNC) if journal_file else None
+
+    def load_shops(self) -> Optional[Dict]:
+        shops = read_json(self.shops_file)
+        if shops is not None:
+            self.replay_journal(shops)
+        return shops
+
+    def iter_shops(self, progress: Optional[Callable[[float], None]] = None) -> Iterator[Tuple[str, Dict]]:
+        """Parse shops one at a time without replaying the journal; see replay_journal().
+
+        progress is called with the fraction of the catalog read as each shop is.
+        """
+        return iter_json_object(self.shops_file, progress=progress)
+
+    def replay_journal(self, shops: Dict):
+        """Apply journaled mutations to a catalog read from the snapshot file."""
+        if not self.journal:
+            return
+        replayed = self.journal.replay(shops)
+        if replayed:
+            logging.info(f"Replayed {replayed} journal entries")
+        if replayed >= JOURNAL_CHECKPOINT_INTERVAL:
+            self.save_shops(shops)
+
+    def save_shops(self, shops: Dict, dirty: Optional[Iterable[str]] = None):
+        write_json(self.shops_file, shops)
+        if self.journal:
+            self.journal.truncate()
+
+    def record(self, shops: Dict, record: Dict) -> bool:
+        """Journal a single product mutation that has already been applied to shops.
+
+        Returns False if the whole catalog should be saved instead: when there is
+        no journal, when it cannot be written or when a checkpoint is due.
+        """
+        if not self.journal:
+            return False
+        try:
+            self.journal.append(record)
+        except IOError as e:
+            logging.error(f"Error writing journal, saving the catalog instead: {e}")
+            return False
+        return self.journal.pending < JOURNAL_CHECKPOINT_INTERVAL
+
+    def coalesce_key(self, record: Dict) -> Optional[Hashable]:
+        """Key under which queued writes of record may be merged; None if they may not."""
+        return None if self.journal else "shops"
+
+    def source_files(self) -> List[str]:
+        """Paths whose modification time changes whenever the stored catalog does."""
+        return [self.shops_file] + ([self.journal.path] if self.journal else [])
+
+    def load_credentials(self, kind: str) -> Optional[Dict]:
+        return read_json(self.credential_files[kind])
+
+    def save_credentials(self, kind: str, data: Dict):
+        write_json(self.credential_files[kind], data)
+
+    def close(self):
+        if self.journal:
+            self.journal.close()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shops (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    location TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    shop_id INTEGER NOT NULL REFERENCES shops(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    stock INTEGER NOT NULL,
+    price NUMERIC NOT NULL,
+    category TEXT,
+    UNIQUE (shop_id, name)
+);
+CREATE TABLE IF NOT EXISTS product_sizes (
+    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS credentials (
+    kind TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_name ON products(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products(price);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+CREATE INDEX IF NOT EXISTS idx_product_sizes_product ON product_sizes(product_id);
+"""
+
+
+class SQLiteBackend:
+    """Stores shops, products, sizes and credentials in a local SQLite database."""
+
+    def __init__(self, path: str = SQLITE_FILE, migrate_from: Optional[JsonBackend] = None):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        if migrate_from is not None and self._is_empty():
+            self.migrate(migrate_from)
+
+    def _is_empty(self) -> bool:
+        return (self.conn.execute("SELECT 1 FROM shops LIMIT 1").fetchone() is None and
+                self.conn.execute("SELECT 1 FROM credentials LIMIT 1").fetchone() is None)
+
+    def migrate(self, source: JsonBackend):
+        """Import an existing JSON catalog and credentials on first run."""
+        shops = source.load_shops()
+        if shops:
+            self.save_shops(shops)
+            logging.info(f"Migrated {len(shops)} shops from {source.shops_file} to {self.path}")
+        for kind in ("admin", "users"):
+            data = source.load_credentials(kind)
+            if data is not None:
+                self.save_credentials(kind, data)
+
+    def load_shops(self) -> Optional[Dict]:
+        with self.lock:
+            shop_rows = self.conn.execute("SELECT id, name, location FROM shops ORDER BY id").fetchall()
+            if not shop_rows:
+                return None
+            sizes: Dict[int, List[int]] = {}
+            for product_id, size in self.conn.execute(
+                    "SELECT product_id, size FROM product_sizes ORDER BY rowid"):
+                sizes.setdefault(product_id, []).append(size)
+            product_rows = self.conn.execute(
+                "SELECT id, shop_id, name, stock, price, category FROM products ORDER BY id").fetchall()
+
+        shops = {}
+        names_by_id = {}
+        for shop_id, name, location in shop_rows:
+            shops[name] = {"Location": location, "Products": {}}
+            names_by_id[shop_id] = name
+        for product_id, shop_id, name, stock, price, category in product_rows:
+            data = {"stock": stock, "Price": price, "Sizes": sizes.get(product_id, [])}
+            if category is not None:
+                data["Category"] = category
+            shops[names_by_id[shop_id]]["Products"][name] = data
+        return shops
+
+    def save_shops(self, shops: Dict, dirty: Optional[Iterable[str]] = None):
+        """Replace the stored dirty shops, or the whole catalog if dirty is None, in a single transaction."""
+        with self.lock, self.conn:
+            if dirty is None:
+                self.conn.execute("DELETE FROM product_sizes")
+                self.conn.execute("DELETE FROM products")
+                self.conn.execute("DELETE FROM shops")
+                for shop_name, shop_data in shops.items():
+                    shop_id = self.conn.execute(
+                        "INSERT INTO shops (name, location) VALUES (?, ?)",
+                        (shop_name, shop_data.get("Location", ""))
+                    ).lastrowid
+                    for product_name, data in shop_data["Products"].items():
+                        self._put_product(shop_id, product_name, data)
+                return
+
+            for shop_name in dirty:
+                if shop_name not in shops:
+                    self.conn.execute("DELETE FROM shops WHERE name = ?", (shop_name,))
+                    continue
+                shop_data = shops[shop_name]
+                shop_id = self.conn.execute(
+                    """INSERT INTO shops (name, location) VALUES (?, ?)
+                       ON CONFLICT (name) DO UPDATE SET location = excluded.location RETURNING id""",
+                    (shop_name, shop_data.get("Location", ""))
+                ).fetchone()[0]
+                self.conn.execute("DELETE FROM products WHERE shop_id = ?", (shop_id,))
+                for product_name, data in shop_data["Products"].items():
+                    self._put_product(shop_id, product_name, data)
+
+    def record(self, shops: Dict, record: Dict) -> bool:
+        """Write a single product mutation through to the database; only its rows are touched."""
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT id FROM shops WHERE name = ?", (record["shop"],)).fetchone()
+            if row is None:
+                location = shops.get(record["shop"], {}).get("Location", "")
+                shop_id = self.conn.execute(
+                    "INSERT INTO shops (name, location) VALUES (?, ?)", (record["shop"], location)
+                ).lastrowid
+            else:
+                shop_id = row[0]
+
+            if record["op"] == "delete":
+                self.conn.execute(
+                    "DELETE FROM products WHERE shop_id = ? AND name = ?", (shop_id, record["product"]))
+            else:
+                data = shops[record["shop"]]["Products"][record["product"]]
+                self._put_product(shop_id, record["product"], data)
+        return True
+
+    def coalesce_key(self, record: Dict) -> Optional[Hashable]:
+        # record() re-reads the product from shops, so only the latest write matters
+        return ("product", record["shop"], record["product"])
+
+    def source_files(self) -> List[str]:
+        return [self.path, self.path + "-wal"]
+
+    def _put_product(self, shop_id: int, product_name: str, data: Dict):
+        product_id = self.conn.execute(
+            """INSERT INTO products (shop_id, name, stock, price, category) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (shop_id, name) DO UPDATE SET
+                   stock = excluded.stock, price = excluded.price, category = excluded.category
+               RETURNING id""",
+            (shop_id, product_name, data["stock"], data["Price"], data.get("Category"))
+        ).fetchone()[0]
+        self.conn.execute("DELETE FROM product_sizes WHERE product_id = ?", (product_id,))
+        self.conn.executemany(
+            "INSERT INTO product_sizes (product_id, size) VALUES (?, ?)",
+            [(product_id, size) for size in data.get("Sizes", [])]
+        )
+
+    def load_credentials(self, kind: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM credentials WHERE kind = ?", (kind,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_credentials(self, kind: str, data: Dict):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO credentials (kind, data) VALUES (?, ?)", (kind, json.dumps(data)))
+
+    def find_products(self, name: Optional[str] = None, min_price: Optional[float] = None,
+                      max_price: Optional[float] = None, by_price: bool = False, descending: bool = False,
+                      limit: Optional[int] = None, in_stock: bool = False) -> List[Tuple[str, str]]:
+        """(shop, product) names matching name (case-insensitive) and the price range, from the indexes.
+
+        Results are in catalog order, or with by_price cheapest (or dearest) first.
+        """
+        clauses, params = [], []
+        if name is not None:
+            clauses.append("p.name = ? COLLATE NOCASE")
+            params.append(name)
+        if min_price is not None:
+            clauses.append("p.price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("p.price <= ?")
+            params.append(max_price)
+        if in_stock:
+            clauses.append("p.stock > 0")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        direction = " DESC" if descending else ""
+        order = f"p.price{direction}, s.id{direction}, p.id{direction}" if by_price else "s.id, p.id"
+        sql = f"SELECT s.name, p.name FROM products p JOIN shops s ON s.id = p.shop_id {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class ShardedBackend(JsonBackend):
+    """Stores each shop in its own JSON shard so a save only rewrites the shops that changed."""
+
+    MANIFEST = "index.json"
+
+    def __init__(self, shards_dir: str = SHARDS_DIR, migrate_from: Optional[JsonBackend] = None,
+                 workers: int = SHARD_LOAD_WORKERS, **json_files):
+        super().__init__(journal_file=None, **json_files)
+        self.shards_dir = shards_dir
+        self.workers = workers
+        os.makedirs(shards_dir, exist_ok=True)
+        # The catalog may come from the parse cache or a snapshot instead of iter_shops(),
+        # so the shard of every stored shop is known from the manifest up front
+        manifest = read_json(self._path(self.MANIFEST))
+        self.shard_files: Dict[str, str] = dict(manifest["shops"]) if manifest else {}
+        if migrate_from is not None and not os.path.exists(self._path(self.MANIFEST)):
+            shops = migrate_from.load_shops()
+            if shops:
+                self.save_shops(shops)
+                logging.info(f"Migrated {len(shops)} shops from {migrate_from.shops_file} to {shards_dir}")
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.shards_dir, filename)
+
+    @staticmethod
+    def shard_filename(shop_name: str) -> str:
+        """Derive a stable, filesystem-safe shard name for a shop."""
+        slug = re.sub(r"[^a-z0-9]+", "-", shop_name.lower()).strip("-")[:40]
+        digest = hashlib.sha1(shop_name.encode("utf-8")).hexdigest()[:8]
+        return f"{slug}-{digest}.json"
+
+    def load_shops(self) -> Optional[Dict]:
+        try:
+            return dict(self.iter_shops())
+        except FileNotFoundError:
+            return None
+
+    def iter_shops(self, progress: Optional[Callable[[float], None]] = None) -> Iterator[Tuple[str, Dict]]:
+        """Yield shops in manifest order while later shards are read in parallel."""
+        manifest = read_json(self._path(self.MANIFEST))
+        if manifest is None:
+            raise FileNotFoundError(self._path(self.MANIFEST))
+        entries = manifest["shops"]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            shards = pool.map(lambda entry: read_json(self._path(entry[1])), entries)
+            for number, ((shop_name, filename), shard) in enumerate(zip(entries, shards), 1):
+                if progress:
+                    progress(number / len(entries))
+                if shard is None:
+                    logging.error(f"Missing or corrupt shard {filename} for shop {shop_name!r}")
+                    continue
+                self.shard_files[shop_name] = filename
+                yield shop_name, shard
+
+    def save_shops(self, shops: Dict, dirty: Optional[Iterable[str]] = None):
+        """Write the shards of the dirty shops, or of every shop when dirty is None."""
+        shop_names = list(shops) if dirty is None else [name for name in dirty if name in shops]
+        for shop_name in shop_names:
+            filename = self.shard_files.get(shop_name) or self.shard_filename(shop_name)
+            write_json(self._path(filename), shops[shop_name])
+            self.shard_files[shop_name] = filename
+
+        if dirty is None or set(self.shard_files) != set(shops):
+            self._save_manifest(shops)
+
+    def _save_manifest(self, shops: Dict):
+        for shop_name in set(self.shard_files) - set(shops):
+            filename = self.shard_files.pop(shop_name)
+            try:
+                os.remove(self._path(filename))
+            except FileNotFoundError:
+                pass
+        write_json(self._path(self.MANIFEST), {
+            "shops": [[shop_name, self.shard_files.get(shop_name) or self.shard_filename(shop_name)]
+                      for shop_name in shops]
+        })
+
+    def record(self, shops: Dict, record: Dict) -> bool:
+        filename = self.shard_files.get(record["shop"])
+        if filename is None:
+            # A new shop also needs the manifest rewritten
+            return False
+        write_json(self._path(filename), shops[record["shop"]])
+        return True
+
+    def coalesce_key(self, record: Dict) -> Optional[Hashable]:
+        return ("shard", record["shop"])
+
+    def source_files(self) -> List[str]:
+        # Shards are replaced by rename, which also updates the directory's mtime
+        return [self.shards_dir, self._path(self.MANIFEST)]
+
+
+def create_backend(name: str):
+    """Create the storage backend selected by STORAGE_BACKEND."""
+    json_backend = JsonBackend(journal_file=JOURNAL_FILE if JOURNAL_ENABLED else None)
+    if name == "json":
+        return json_backend
+    if name == "sqlite":
+        return SQLiteBackend(SQLITE_FILE, migrate_from=json_backend)
+    if name == "sharded":
+        return ShardedBackend(SHARDS_DIR, migrate_from=json_backend)
+    raise ValueError(f"Unknown storage backend: {name}")
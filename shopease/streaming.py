@@ -0,0 +1,97 @@
+import json
+import os
+from typing import Any, Callable, Iterator, Optional, TextIO, Tuple
+
+CHUNK_SIZE = 1 << 16
+
+
+class _ChunkedText:
+    """A read buffer over a text file that only keeps the unparsed tail in memory."""
+
+    def __init__(self, file: TextIO, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read more text, at least doubling what is buffered; False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.file.read(max(self.chunk_size, len(self.text) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self) -> str:
+        """Consume and return the next non-whitespace character, or "" at end of file."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.text):
+                self.pos += 1
+                return self.text[self.pos - 1]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.next_char()
+        if found != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.text, self.pos)
+
+    def decode(self, decoder: json.JSONDecoder) -> Any:
+        """Decode the next JSON value, reading more text until it is complete."""
+        char = self.next_char()
+        if not char:
+            raise json.JSONDecodeError("Expecting value", self.text, self.pos)
+        self.pos -= 1
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A value ending exactly at the buffer edge may be a truncated number
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_object(path: str, chunk_size: int = CHUNK_SIZE,
+                     progress: Optional[Callable[[float], None]] = None) -> Iterator[Tuple[str, Any]]:
+    """Yield the (key, value) pairs of the top-level JSON object in path one at a time.
+
+    Only one member value is materialized at a time, so memory use is bounded by
+    the largest member (one shop, for shops.json) rather than the whole file.
+    progress, if given, is called with the fraction of the file read before each
+    pair is yielded. Raises FileNotFoundError or json.JSONDecodeError like json.load would.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as file:
+        size = os.fstat(file.fileno()).st_size
+        buffer = _ChunkedText(file, chunk_size)
+        buffer.expect("{")
+        char = buffer.next_char()
+        if char == "}":
+            return
+        buffer.pos -= 1
+        while True:
+            key = buffer.decode(decoder)
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", buffer.text, buffer.pos)
+            buffer.expect(":")
+            value = buffer.decode(decoder)
+            if progress and size:
+                progress(min(file.buffer.tell() / size, 1.0))
+            yield key, value
+            char = buffer.next_char()
+            if char == "}":
+                return
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer.text, buffer.pos)
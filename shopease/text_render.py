@@ -0,0 +1,65 @@
+import logging
+import tkinter as tk
+from typing import Callable, Iterable, Iterator, Optional
+from .config import RENDER_CHUNK_SIZE, RENDER_CHUNK_INTERVAL_MS
+
+
+class ChunkedRenderer:
+    """Writes a stream of text blocks into a Text widget a chunk at a time, scheduled with root.after.
+
+    The first chunk is written straight away, so results appear in the next
+    frame however many there are; the rest follow between other events, keeping
+    the window responsive. Blocks are pulled from their iterable only as they
+    are written, so a generator spreads its formatting work across chunks too.
+    Starting a new render, or cancel(), abandons the one in progress.
+    """
+
+    def __init__(self, root, text_widget: tk.Text, chunk_size: int = RENDER_CHUNK_SIZE,
+                 interval_ms: int = RENDER_CHUNK_INTERVAL_MS, separator: str = "\n\n"):
+        self.root = root
+        self.text_widget = text_widget
+        self.chunk_size = chunk_size
+        self.interval_ms = interval_ms
+        self.separator = separator
+        self.generation = 0
+        self.after_id: Optional[str] = None
+
+    @property
+    def rendering(self) -> bool:
+        return self.after_id is not None
+
+    def render(self, blocks: Iterable[str], on_done: Optional[Callable[[int], None]] = None):
+        """Replace the widget's text with blocks; on_done(count) is called once every block is written."""
+        self.cancel()
+        self.text_widget.delete(1.0, tk.END)
+        self._write(self.generation, iter(blocks), 0, on_done)
+
+    def cancel(self):
+        self.generation += 1
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _write(self, generation: int, blocks: Iterator[str], written: int, on_done):
+        self.after_id = None
+        if generation != self.generation:
+            return
+        if not self.text_widget.winfo_exists():
+            return
+        chunk = []
+        try:
+            for block in blocks:
+                chunk.append(block)
+                if len(chunk) == self.chunk_size:
+                    break
+        except Exception as e:
+            logging.error(f"Rendering results failed: {e}")
+            return
+        if chunk:
+            # One insert per chunk; every insert makes Tk re-layout the text
+            self.text_widget.insert(tk.END, (self.separator if written else "") + self.separator.join(chunk))
+            written += len(chunk)
+        if len(chunk) == self.chunk_size:
+            self.after_id = self.root.after(self.interval_ms, self._write, generation, blocks, written, on_done)
+        elif on_done:
+            on_done(written)
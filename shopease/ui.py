@@ -1,27 +1,42 @@
+import logging
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox, scrolledtext
-from typing import Dict, List, Callable
-from .config import THEMES, ICON_PATH
+from typing import Dict, List, Callable, Optional
+from .config import THEMES, ICON_PATH, SUGGESTION_DEBOUNCE_MS, SUGGESTION_POLL_MS
+from .async_query import AsyncQuery
 from .data import DataHandler
+from .result_list import Column, ResultList
+from .screens import ScreenManager, screen
+from .text_render import ChunkedRenderer
 from .utils import validate_username, validate_password, show_tooltip
-from email_handler import EmailHandler
 
 class ShopEaseUI:
-    def __init__(self, root: tk.Tk, data_handler: DataHandler):
+    def __init__(self, root: tk.Tk, data_handler: DataHandler, on_ready: Optional[Callable[[], None]] = None):
         self.root = root
         self.data_handler = data_handler
+        # Called once the data is loaded and the main menu shown
+        self.on_ready = on_ready
+        self.catalog = data_handler.catalog
         self.current_theme = "light"
         self.colors = THEMES[self.current_theme]
         self.current_button_index = 0
         self.buttons = []
         self.current_user = None
+        # Suggestions and searches run here, one at a time, off the Tk thread
+        self.query_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shopease-query")
+        # The global search results window, kept open between searches
+        self.search_results_window = None
+        self.search_renderer = None
 
         self.root.title("ShopEase")
         self.root.geometry("1200x800")
         self.root.iconbitmap(ICON_PATH)
         self.root.configure(bg=self.colors["background"])
 
-        self.email_handler = EmailHandler(self.root, self.create_main_menu)
+        # Rarely used, so made (and its module imported) on first use; see send_mail
+        self.email_handler = None
         self.setup_styles()
         self.setup_menu()
 
@@ -44,9 +59,10 @@ class ShopEaseUI:
 
         self.canvas.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
+        # Each screen is built once into its own frame here and swapped in on navigation
+        self.screens = ScreenManager(self.scrollable_frame)
         # --- END SCROLLABLE MAIN FRAME SETUP ---
 
-        self.show_splash()
         self.setup_system_tray()
 
         # --- Persistent Back Button ---
@@ -54,6 +70,8 @@ class ShopEaseUI:
         self.back_button.place(relx=0.5, rely=0.97, anchor="s", width=120)
         self.back_button.lower()  # Hide by default
 
+        self.show_splash()
+
     def setup_styles(self):
         """Configure UI styles."""
         self.style = ttk.Style()
@@ -116,6 +134,8 @@ class ShopEaseUI:
         self.colors = THEMES[theme]
         self.setup_styles()
         self.refresh_ui()
+        # Hidden screens are rebuilt in the new colours when next shown
+        self.screens.clear()
 
     def refresh_ui(self):
         """Refresh UI to apply theme changes."""
@@ -145,6 +165,8 @@ class ShopEaseUI:
 
     def logout(self):
         self.current_user = None
+        # Cached screens may hold the previous user's searches
+        self.screens.clear()
         self.create_main_menu()
 
     def setup_system_tray(self):
@@ -161,25 +183,71 @@ class ShopEaseUI:
         # Add actual system tray icon with pystray in production
 
     def show_splash(self):
-        """Show splash screen."""
+        """Show the splash screen while the catalog and credentials load, then open the main menu."""
         splash = tk.Toplevel(self.root)
         splash.overrideredirect(True)
         splash.geometry("600x400+400+200")
         # Placeholder for splash image
         tk.Label(splash, text="Welcome to ShopEase", font=("Roboto", 24)).pack(expand=True)
-        splash.after(2000, lambda: [splash.destroy(), self.create_main_menu()])
+        status_label = ttk.Label(splash, text="Starting...")
+        status_label.pack(pady=(0, 10))
+        progress_bar = ttk.Progressbar(splash, mode="determinate", maximum=1.0, length=400)
+        progress_bar.pack(pady=(0, 40))
+
+        def load(report):
+            try:
+                self.data_handler.load(report)
+                return True
+            except Exception as e:
+                logging.error(f"Loading data failed: {e}")
+                return False
+
+        def loaded(ok):
+            splash.destroy()
+            if not ok:
+                messagebox.showerror("Error", "Failed to load the shop data. See the log for details.")
+            self.create_main_menu()
+            # Build the search indexes off the Tk thread now the menu is up, so the first search is fast
+            self.data_handler.catalog.build_in_background()
+            if self.on_ready:
+                self.on_ready()
+
+        if self.data_handler.load_started is not None:
+            # The handler was loaded when it was made
+            loaded(True)
+            return
+        # Tk stays on this thread, so the splash keeps redrawing while the data loads
+        self.run_in_background(load, status_label, loaded, progress_bar)
 
     def show_about(self):
         """Show about dialog."""
         messagebox.showinfo("About", "ShopEase v1.0.0\nA product management system for footwear shops.\nDeveloped by Edwin, Abhirami, Sreesh")
 
-    def clear_frame(self):
-        """Clear the main frame."""
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        self.buttons = []
+    def show_screen(self, name: str, build: Callable, cache: bool = True):
+        """Show a screen, building it with build(frame) unless it is cached from an earlier visit."""
+        def build_screen(new_screen):
+            # Buttons made with create_button during the build belong to this screen
+            self.buttons = new_screen.buttons
+            new_screen.refresh = build(new_screen.frame)
+
+        shown = self.screens.show(name, build_screen, cache)
+        self.buttons = shown.buttons
         self.current_button_index = 0
-        self.set_back_button(show=False)
+        self.set_back_button(shown.back, show=shown.back is not None)
+
+    def set_back_button(self, command: Optional[Callable] = None, show: bool = True):
+        """Point the persistent Back button at command for the current screen, or hide it."""
+        if self.screens.current is not None:
+            self.screens.current.back = command if show else None
+        if show and command is not None:
+            self.back_button.config(command=command)
+            self.back_button.lift()
+        else:
+            self.back_button.lower()
+
+    def back_to_panel(self):
+        """Point Back at whichever panel, admin or user, the current screen was opened from."""
+        self.set_back_button(self.admin_panel if self.screens.previous == "admin_panel" else self.user_panel)
 
     def create_button(self, parent, text, command, width=None):
         btn = ttk.Button(parent, text=text, command=command, width=width, style="TButton")
@@ -193,6 +261,37 @@ class ShopEaseUI:
         entry.pack(pady=8, padx=20, fill="x")
         return entry
 
+    def run_in_background(self, task: Callable, status_label, on_done: Callable, progress_bar=None):
+        """Run task(report) on a worker thread, showing its latest report(text) in status_label,
+        then call on_done(result) on the Tk thread. report(text, fraction) also fills progress_bar."""
+        state = {"status": "", "fraction": 0.0, "done": False, "result": None}
+
+        def report(text, fraction=None):
+            state["status"] = text
+            if fraction is not None:
+                state["fraction"] = fraction
+
+        def run():
+            try:
+                state["result"] = task(report)
+            finally:
+                state["done"] = True
+
+        def poll():
+            if not status_label.winfo_exists():
+                return
+            if state["done"]:
+                status_label.config(text="")
+                on_done(state["result"])
+            else:
+                status_label.config(text=state["status"])
+                if progress_bar is not None:
+                    progress_bar.config(value=state["fraction"])
+                self.root.after(100, poll)
+
+        threading.Thread(target=run, daemon=True).start()
+        poll()
+
     def setup_button_navigation(self):
         def on_arrow_key(event):
             if event.keysym == "Up":
@@ -219,8 +318,8 @@ class ShopEaseUI:
             btn.bind("<Tab>", on_tab)
             btn.bind("<Shift-Tab>", on_tab)
 
-    def create_main_menu(self):
-        self.clear_frame()
+    @screen
+    def create_main_menu(self, frame):
         # The container and canvas are already centered and sized
         self.container.place(relx=0.5, rely=0.5, anchor="center", width=600, height=500)
         self.container.configure(style="Frame.TFrame", borderwidth=2, relief="groove")
@@ -228,42 +327,59 @@ class ShopEaseUI:
         self.scrollable_frame.configure(style="Frame.TFrame")
 
         # Global search bar at the top (fixed)
-        search_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+        search_frame = ttk.Frame(frame, style="Card.TFrame")
         search_frame.pack(pady=(10, 20), padx=30, fill="x")
         search_entry = ttk.Entry(search_frame, font=("Segoe UI", 12), style="TEntry")
         search_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
         search_button = ttk.Button(search_frame, text="Search", style="TButton")
         search_button.pack(side="left")
+        show_tooltip(search_entry, "e.g. nike size:9 price<2000 category:Sneakers shop:Kobbler")
+
+        def global_search(query):
+            # Search products, and shops too for plain words; field terms such as size:9 or price<2000 filter products
+            from .query import QueryError
+            try:
+                result = self.catalog.run_query(query)
+            except QueryError as e:
+                return [f"Invalid search: {e}"]
+            shops = self.catalog.search_shops(query) if result.query.is_plain else []
+            if not shops and not result.matches:
+                return ["No matching products or shops found."]
+
+            def blocks():
+                # Formatted as they are rendered, a chunk at a time
+                for shop in shops:
+                    yield f"Shop: {shop}\nLocation: {self.data_handler.shops[shop]['Location']}"
+                for shop, product, pdata in result.matches:
+                    yield f"Product: {product}\nShop: {shop}\nStock: {pdata['stock']}\nPrice: ₹{pdata['Price']}\nSizes: {pdata['Sizes']}"
+                if len(result.matches) < result.total:
+                    yield f"... and {result.total - len(result.matches)} more products; add terms to narrow the search."
+            return blocks()
+
+        search_query = AsyncQuery(self.root, self.query_executor, global_search, self.show_search_results,
+                                  SUGGESTION_DEBOUNCE_MS, SUGGESTION_POLL_MS, search_entry.winfo_exists)
 
         def do_global_search():
             query = search_entry.get().strip().lower()
+            if self.search_renderer is not None:
+                # Stop drawing the previous results while the new query runs
+                self.search_renderer.cancel()
             if not query:
+                search_query.cancel()
                 messagebox.showinfo("Search", "Please enter a search term.")
                 return
-            # Search products and shops
-            results = []
-            for shop, shop_data in self.data_handler.shops.items():
-                if query in shop.lower():
-                    results.append(f"Shop: {shop}\nLocation: {shop_data['Location']}")
-                for product, pdata in shop_data["Products"].items():
-                    if query in product.lower():
-                        results.append(f"Product: {product}\nShop: {shop}\nStock: {pdata['stock']}\nPrice: ₹{pdata['Price']}\nSizes: {pdata['Sizes']}")
-            if results:
-                result_text = "\n\n".join(results)
-            else:
-                result_text = "No matching products or shops found."
-            messagebox.showinfo("Search Results", result_text)
+            search_query.submit(query)
 
         search_button.config(command=do_global_search)
         search_entry.bind('<Return>', lambda e: do_global_search())
 
         # Header
-        header_frame = ttk.Frame(self.scrollable_frame, style="Frame.TFrame")
+        header_frame = ttk.Frame(frame, style="Frame.TFrame")
         header_frame.pack(fill="x", pady=(0, 20))
         ttk.Label(header_frame, text="ShopEase", style="Title.TLabel", font=("Segoe UI", 32, "bold")).pack(anchor="center")
 
         # Content frame (centered, modern look)
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
         content_frame.configure(borderwidth=2, relief="ridge")
         content_frame.pack_propagate(False)
@@ -273,20 +389,44 @@ class ShopEaseUI:
             ("Shopkeeper", self.shopkeeper_menu),
             ("User", self.user_menu),
             ("Contact", self.contact_info),
-            ("Send Mail to Developer", self.email_handler.send_mail_window),
+            ("Send Mail to Developer", self.send_mail),
             ("Exit", self.root.quit)
         ]
-        for text, command in buttons:
-            self.create_button(content_frame, text, command)
+        menu_buttons = [self.create_button(content_frame, text, command) for text, command in buttons]
         self.setup_button_navigation()
-        if self.buttons:
-            self.buttons[0].focus_set()
 
         self.set_back_button(show=False)
 
-    def shopkeeper_menu(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+        def refresh():
+            menu_buttons[0].focus_set()
+
+        refresh()
+        return refresh
+
+    def send_mail(self):
+        if self.email_handler is None:
+            from email_handler import EmailHandler
+            self.email_handler = EmailHandler(self.root, self.create_main_menu)
+        self.email_handler.send_mail_window()
+
+    def show_search_results(self, blocks):
+        """Stream global search results into a results window, reusing it if it is still open."""
+        if self.search_results_window is None or not self.search_results_window.winfo_exists():
+            window = tk.Toplevel(self.root)
+            window.title("Search Results")
+            window.geometry("500x400")
+            result_text = scrolledtext.ScrolledText(window, font=("Roboto", 10), wrap=tk.WORD,
+                                                    bg=self.colors["input_bg"])
+            result_text.pack(fill="both", expand=True, padx=10, pady=10)
+            self.search_results_window = window
+            self.search_renderer = ChunkedRenderer(self.root, result_text)
+        self.search_results_window.deiconify()
+        self.search_results_window.lift()
+        self.search_renderer.render(blocks)
+
+    @screen
+    def shopkeeper_menu(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Shopkeeper Menu", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -295,9 +435,9 @@ class ShopEaseUI:
         self.create_button(content_frame, "Login", self.admin_login_window)
         self.set_back_button(self.create_main_menu, show=True)
 
-    def user_menu(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen
+    def user_menu(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="User Menu", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -306,9 +446,9 @@ class ShopEaseUI:
         self.create_button(content_frame, "Login", self.user_login_window)
         self.set_back_button(self.create_main_menu, show=True)
 
-    def admin_signup_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen(cache=False)
+    def admin_signup_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Admin Sign-up", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -369,9 +509,9 @@ class ShopEaseUI:
         self.create_button(button_frame, "Submit", submit, width=15)
         self.set_back_button(self.shopkeeper_menu, show=True)
 
-    def admin_login_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen(cache=False)
+    def admin_login_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Admin Login", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -442,9 +582,9 @@ class ShopEaseUI:
         self.create_button(button_frame, "Login", submit, width=15)
         self.set_back_button(self.shopkeeper_menu, show=True)
 
-    def user_signup_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen(cache=False)
+    def user_signup_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="User Sign-up", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -488,9 +628,9 @@ class ShopEaseUI:
         self.create_button(button_frame, "Submit", submit, width=15)
         self.set_back_button(self.user_menu, show=True)
 
-    def user_login_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen(cache=False)
+    def user_login_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="User Login", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -521,9 +661,9 @@ class ShopEaseUI:
         self.create_button(button_frame, "Login", submit, width=15)
         self.set_back_button(self.user_menu, show=True)
 
-    def admin_panel(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen
+    def admin_panel(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Admin Panel", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -534,6 +674,7 @@ class ShopEaseUI:
             ("Update Product", self.update_product_window),
             ("Display Brands", self.display_brands),
             ("Shop Details", self.shop_details),
+            ("Import Inventory", self.import_inventory_window),
             ("Export Inventory", self.export_inventory_window),
             ("Logout", self.shopkeeper_menu)
         ]
@@ -543,9 +684,9 @@ class ShopEaseUI:
 
         self.set_back_button(self.shopkeeper_menu, show=True)
 
-    def user_panel(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen
+    def user_panel(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="User Panel", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -553,6 +694,7 @@ class ShopEaseUI:
         buttons = [
             ("Search Product", self.search_product_window),
             ("Search by Price", self.search_by_price_window),
+            ("Filter Products", self.facet_search_window),
             ("Display Brands", self.display_brands),
             ("Shop Details", self.shop_details),
             ("User Profile", self.user_profile_window),
@@ -564,9 +706,9 @@ class ShopEaseUI:
 
         self.set_back_button(self.user_menu, show=True)
 
-    def add_products_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen
+    def add_products_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Add Products", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -619,13 +761,12 @@ class ShopEaseUI:
 
                 category = category_entry.get().strip() or "Uncategorized"
 
-                self.data_handler.shops[shop_name]["Products"][product_name] = {
+                self.data_handler.add_product(shop_name, product_name, {
                     "stock": stock,
                     "Price": price,
                     "Sizes": sizes_list,
                     "Category": category
-                }
-                self.data_handler.save_shops()
+                })
                 messagebox.showinfo("Success", f"Product {product_name} added successfully!")
                 
                 product_name_entry.delete(0, tk.END)
@@ -667,9 +808,9 @@ class ShopEaseUI:
         self.create_button(button_frame, "Add Product", add_product, width=15)
         self.set_back_button(self.admin_panel, show=True)
 
-    def delete_product_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen(cache=False)
+    def delete_product_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Delete Product", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -691,8 +832,7 @@ class ShopEaseUI:
                 messagebox.showerror("Error", "Product not found!")
                 return
 
-            del self.data_handler.shops[shop_name]["Products"][product_name]
-            self.data_handler.save_shops()
+            self.data_handler.delete_product(shop_name, product_name)
             messagebox.showinfo("Success", "Product deleted successfully!")
             self.admin_panel()
 
@@ -710,9 +850,9 @@ class ShopEaseUI:
         self.create_button(button_frame, "Delete", delete, width=15)
         self.set_back_button(self.admin_panel, show=True)
 
-    def update_product_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen(cache=False)
+    def update_product_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Update Product", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -751,29 +891,30 @@ class ShopEaseUI:
 
             def update():
                 try:
+                    changes = {}
                     if price_entry.get().strip():
                         price = float(price_entry.get().strip())
                         if price <= 0:
                             raise ValueError("Price must be positive")
-                        self.data_handler.shops[shop_name]["Products"][product_name]["Price"] = price
+                        changes["Price"] = price
 
                     if stock_entry.get().strip():
                         stock = int(stock_entry.get().strip())
                         if stock < 0:
                             raise ValueError("Stock cannot be negative")
-                        self.data_handler.shops[shop_name]["Products"][product_name]["stock"] = stock
+                        changes["stock"] = stock
 
                     if sizes_entry.get().strip():
                         sizes = sizes_entry.get().strip()
                         sizes_list = [int(size.strip()) for size in sizes.split(",") if size.strip()]
                         if not sizes_list:
                             raise ValueError("At least one size must be provided")
-                        self.data_handler.shops[shop_name]["Products"][product_name]["Sizes"] = sizes_list
+                        changes["Sizes"] = sizes_list
 
                     if category_entry.get().strip():
-                        self.data_handler.shops[shop_name]["Products"][product_name]["Category"] = category_entry.get().strip()
+                        changes["Category"] = category_entry.get().strip()
 
-                    self.data_handler.save_shops()
+                    self.data_handler.update_product(shop_name, product_name, changes)
                     messagebox.showinfo("Success", "Product updated successfully!")
                     self.admin_panel()
 
@@ -811,19 +952,7 @@ class ShopEaseUI:
         self.set_back_button(self.admin_panel, show=True)
 
     def get_search_suggestions(self, query: str) -> List[str]:
-        query = query.lower()
-        suggestions = set()
-        
-        for shop_data in self.data_handler.shops.values():
-            for product in shop_data["Products"].keys():
-                if query in product.lower():
-                    suggestions.add(product)
-                query_words = query.split()
-                product_words = product.lower().split()
-                if any(word in product_words for word in query_words):
-                    suggestions.add(product)
-        
-        return sorted(list(suggestions))
+        return self.catalog.complete_products(query)
 
     def create_suggestion_listbox(self, parent, entry_widget, callback):
         listbox = tk.Listbox(
@@ -836,27 +965,40 @@ class ShopEaseUI:
             borderwidth=1
         )
         
-        def update_suggestions(*args):
-            query = entry_widget.get().strip()
-            suggestions = self.get_search_suggestions(query)
-            
+        def show_suggestions(suggestions):
             listbox.delete(0, tk.END)
-            if suggestions and query:
+            if suggestions:
                 for suggestion in suggestions:
                     listbox.insert(tk.END, suggestion)
                 listbox.pack(pady=2, padx=20, fill="x")
             else:
                 listbox.pack_forget()
+
+        suggestion_query = AsyncQuery(self.root, self.query_executor, self.get_search_suggestions,
+                                      show_suggestions, SUGGESTION_DEBOUNCE_MS, SUGGESTION_POLL_MS,
+                                      listbox.winfo_exists)
+
+        def update_suggestions(event=None):
+            if event is not None and event.keysym in ("Up", "Down", "Escape", "Return"):
+                return
+            query = entry_widget.get().strip()
+            if query:
+                suggestion_query.submit(query)
+            else:
+                suggestion_query.cancel()
+                show_suggestions([])
         
         def on_select(event):
             if listbox.curselection():
                 selected = listbox.get(listbox.curselection())
+                suggestion_query.cancel()
                 entry_widget.delete(0, tk.END)
                 entry_widget.insert(0, selected)
                 listbox.pack_forget()
                 callback()
         
         def on_escape(event):
+            suggestion_query.cancel()
             listbox.pack_forget()
         
         def on_up_down(event):
@@ -888,9 +1030,24 @@ class ShopEaseUI:
         
         return listbox
 
-    def search_product_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    def create_product_list(self, parent) -> ResultList:
+        """A sortable result list with one row per (shop, brand, data) product match."""
+        result_list = ResultList(parent, [
+            Column("Brand", 130, lambda match: match[1]),
+            Column("Shop", 130, lambda match: match[0]),
+            Column("Location", 170, lambda match: self.data_handler.shops[match[0]]["Location"]),
+            Column("Stock", 60, lambda match: match[2]["stock"]),
+            Column("Price", 80, lambda match: match[2]["Price"], lambda price: f"₹{price}"),
+            Column("Sizes", 110, lambda match: match[2]["Sizes"],
+                   lambda sizes: ", ".join(str(size) for size in sizes)),
+            Column("Category", 110, lambda match: match[2].get("Category", "Uncategorized")),
+        ], self.colors)
+        result_list.pack(pady=10, fill="both", expand=True, padx=20)
+        return result_list
+
+    @screen
+    def search_product_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Search Product", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -901,44 +1058,26 @@ class ShopEaseUI:
         ttk.Label(search_frame, text="Product Name:").pack(anchor="w")
         product_name_entry = self.create_entry(search_frame)
 
-        result_text = scrolledtext.ScrolledText(
-            content_frame,
-            height=15,
-            font=("Roboto", 10),
-            wrap=tk.WORD,
-            bg=self.colors["input_bg"]
-        )
-        result_text.pack(pady=10, fill="both", expand=True, padx=20)
+        status_label = ttk.Label(content_frame, text="")
+        status_label.pack(anchor="w", padx=20, pady=(10, 0))
+        result_list = self.create_product_list(content_frame)
+
+        last_search = {"generation": None, "name": None}
 
         def search():
-            product_name = product_name_entry.get().strip()
-            results = [
-                {
-                    "Shop": shop,
-                    "Location": shop_data["Location"],
-                    "stock": brand_data["stock"],
-                    "Price": brand_data["Price"],
-                    "Sizes": brand_data["Sizes"],
-                    "Category": brand_data.get("Category", "Uncategorized")
-                }
-                for shop, shop_data in self.data_handler.shops.items()
-                for brand, brand_data in shop_data["Products"].items()
-                if product_name.lower() == brand.lower()
-            ]
-
-            result_text.delete(1.0, tk.END)
-            if results:
-                result_text.insert(tk.END, "Matching products found:\n\n")
-                for result in results:
-                    result_text.insert(tk.END, f"Shop: {result['Shop']}\n")
-                    result_text.insert(tk.END, f"Location: {result['Location']}\n")
-                    result_text.insert(tk.END, f"Stock: {result['stock']}\n")
-                    result_text.insert(tk.END, f"Price: ₹{result['Price']}\n")
-                    result_text.insert(tk.END, f"Sizes: {result['Sizes']}\n")
-                    result_text.insert(tk.END, f"Category: {result['Category']}\n")
-                    result_text.insert(tk.END, "-" * 50 + "\n\n")
-            else:
-                result_text.insert(tk.END, "No matching products found.")
+            show_results(product_name_entry.get().strip())
+
+        def show_results(product_name):
+            last_search.update(generation=self.catalog.generation, name=product_name)
+            matches = self.catalog.find_products(name=product_name)
+            heading = f"{len(matches)} matching products found"
+            if not matches and product_name:
+                # Fall back to the closest names, so a typo such as "Skechrs" still finds "Skechers"
+                for close_name, _ in self.catalog.fuzzy_product_names(product_name, 5):
+                    matches += self.catalog.find_products(name=close_name)
+                heading = f"No exact match for '{product_name}'. Closest products:"
+            result_list.set_rows(matches)
+            status_label.config(text=heading if matches else "No matching products found.")
 
         suggestion_listbox = self.create_suggestion_listbox(
             search_frame,
@@ -948,100 +1087,242 @@ class ShopEaseUI:
 
         def on_enter(event):
             search()
-            result_text.focus_set()
+            result_list.canvas.focus_set()
 
         product_name_entry.bind('<Return>', on_enter)
-        result_text.bind('<Return>', lambda e: product_name_entry.focus_set())
+        result_list.canvas.bind('<Return>', lambda e: product_name_entry.focus_set())
 
         self.set_back_button(self.user_panel, show=True)
 
-    def search_by_price_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+        def refresh():
+            # Redo the last search if the catalog has changed since
+            if last_search["generation"] not in (None, self.catalog.generation):
+                show_results(last_search["name"])
+        return refresh
+
+    @screen
+    def search_by_price_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Search by Price", style="Subtitle.TLabel").pack(pady=(20, 10))
 
+        ttk.Label(content_frame, text="Minimum Price (optional):").pack(anchor="w", padx=20)
+        min_price_entry = self.create_entry(content_frame)
+
         ttk.Label(content_frame, text="Maximum Price:").pack(anchor="w", padx=20)
         price_entry = self.create_entry(content_frame)
 
-        result_text = scrolledtext.ScrolledText(
-            content_frame,
-            height=15,
-            font=("Roboto", 10),
-            wrap=tk.WORD,
-            bg=self.colors["input_bg"]
-        )
-        result_text.pack(pady=10, fill="both", expand=True, padx=20)
+        options_frame = ttk.Frame(content_frame)
+        options_frame.pack(fill="x", padx=20)
+        ttk.Label(options_frame, text="Sort by:").pack(side="left")
+        sort_options = {"Price: Low to High": False, "Price: High to Low": True}
+        sort_var = tk.StringVar(value="Price: Low to High")
+        ttk.Combobox(options_frame, textvariable=sort_var, values=list(sort_options),
+                     state="readonly", width=20).pack(side="left", padx=(5, 20))
+        ttk.Label(options_frame, text="Show:").pack(side="left")
+        limit_options = {"All": None, "Top 10": 10, "Top 50": 50, "Top 100": 100}
+        limit_var = tk.StringVar(value="All")
+        ttk.Combobox(options_frame, textvariable=limit_var, values=list(limit_options),
+                     state="readonly", width=10).pack(side="left", padx=5)
+        in_stock_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="In stock only", variable=in_stock_var).pack(side="left", padx=(20, 0))
+
+        status_label = ttk.Label(content_frame, text="")
+        status_label.pack(anchor="w", padx=20, pady=(10, 0))
+        result_list = self.create_product_list(content_frame)
+
+        def parse_price(entry):
+            text = entry.get().strip()
+            if not text:
+                return None
+            price = float(text)
+            if price < 0:
+                raise ValueError("Price cannot be negative")
+            return price
+
+        last_search = {"generation": None, "args": None}
 
         def search():
             try:
-                max_price = float(price_entry.get().strip())
-                if max_price <= 0:
+                min_price = parse_price(min_price_entry)
+                max_price = parse_price(price_entry)
+                if max_price is not None and max_price <= 0:
                     raise ValueError("Price must be positive")
+                if min_price is None and max_price is None:
+                    raise ValueError("Enter a minimum or maximum price")
+                if min_price is not None and max_price is not None and min_price > max_price:
+                    raise ValueError("Minimum price cannot exceed maximum price")
 
-                results = [
-                    {
-                        "Shop": shop,
-                        "Location": shop_data["Location"],
-                        "Brand": brand,
-                        "stock": brand_data["stock"],
-                        "Price": brand_data["Price"],
-                        "Sizes": brand_data["Sizes"],
-                        "Category": brand_data.get("Category", "Uncategorized")
-                    }
-                    for shop, shop_data in self.data_handler.shops.items()
-                    for brand, brand_data in shop_data["Products"].items()
-                    if brand_data["Price"] <= max_price
-                ]
-
-                result_text.delete(1.0, tk.END)
-                if results:
-                    result_text.insert(tk.END, "Products within price range:\n\n")
-                    for result in results:
-                        result_text.insert(tk.END, f"Shop: {result['Shop']}\n")
-                        result_text.insert(tk.END, f"Location: {result['Location']}\n")
-                        result_text.insert(tk.END, f"Brand: {result['Brand']}\n")
-                        result_text.insert(tk.END, f"Stock: {result['stock']}\n")
-                        result_text.insert(tk.END, f"Price: ₹{result['Price']}\n")
-                        result_text.insert(tk.END, f"Sizes: {result['Sizes']}\n")
-                        result_text.insert(tk.END, f"Category: {result['Category']}\n")
-                        result_text.insert(tk.END, "-" * 50 + "\n\n")
-                else:
-                    result_text.insert(tk.END, "No products found within price range.")
+                show_results((min_price, max_price, sort_options[sort_var.get()],
+                              limit_options[limit_var.get()], in_stock_var.get()))
 
             except ValueError as e:
                 messagebox.showerror("Error", f"Invalid input: {e}")
 
+        def show_results(search_args):
+            last_search.update(generation=self.catalog.generation, args=search_args)
+            matches = self.catalog.find_by_price(*search_args)
+            result_list.set_rows(matches)
+            status_label.config(text=f"{len(matches)} products within price range" if matches
+                                else "No products found within price range.")
+
         def on_enter(event):
             search()
-            result_text.focus_set()
+            result_list.canvas.focus_set()
 
+        min_price_entry.bind('<Return>', lambda e: price_entry.focus_set())
         price_entry.bind('<Return>', on_enter)
-        result_text.bind('<Return>', lambda e: price_entry.focus_set())
+        result_list.canvas.bind('<Return>', lambda e: price_entry.focus_set())
 
         self.set_back_button(self.user_panel, show=True)
 
-    def display_brands(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+        def refresh():
+            # Redo the last search if the catalog has changed since
+            if last_search["generation"] not in (None, self.catalog.generation):
+                show_results(last_search["args"])
+        return refresh
+
+    @screen
+    def facet_search_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
-        ttk.Label(content_frame, text="Available Brands", style="Subtitle.TLabel").pack(pady=(20, 10))
+        ttk.Label(content_frame, text="Filter Products", style="Subtitle.TLabel").pack(pady=(20, 10))
+
+        ttk.Label(content_frame, text="Name contains (optional):").pack(anchor="w", padx=20)
+        name_entry = self.create_entry(content_frame)
+
+        category_frame = ttk.Frame(content_frame)
+        category_frame.pack(fill="x", padx=20)
+        ttk.Label(category_frame, text="Category:").pack(side="left")
+        category_var = tk.StringVar(value="Any")
+        category_box = ttk.Combobox(category_frame, textvariable=category_var, state="readonly", width=20)
+        category_box.pack(side="left", padx=(5, 20))
+        in_stock_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(category_frame, text="In stock only", variable=in_stock_var).pack(side="left")
+
+        ttk.Label(content_frame, text="Sizes (comma-separated, any of):").pack(anchor="w", padx=20)
+        sizes_entry = self.create_entry(content_frame)
+
+        ttk.Label(content_frame, text="Shops (comma-separated, optional):").pack(anchor="w", padx=20)
+        shops_entry = self.create_entry(content_frame)
+
+        ttk.Label(content_frame, text="Minimum Price (optional):").pack(anchor="w", padx=20)
+        min_price_entry = self.create_entry(content_frame)
+
+        ttk.Label(content_frame, text="Maximum Price (optional):").pack(anchor="w", padx=20)
+        max_price_entry = self.create_entry(content_frame)
+
+        result_text = scrolledtext.ScrolledText(
+            content_frame,
+            height=15,
+            font=("Roboto", 10),
+            wrap=tk.WORD,
+            bg=self.colors["input_bg"]
+        )
+        renderer = ChunkedRenderer(self.root, result_text)
+
+        def split_list(entry):
+            return [item.strip() for item in entry.get().split(",") if item.strip()]
+
+        def parse_price(entry):
+            text = entry.get().strip()
+            if not text:
+                return None
+            price = float(text)
+            if price < 0:
+                raise ValueError("Price cannot be negative")
+            return price
 
-        brands = sorted({brand for shop_data in self.data_handler.shops.values() for brand in shop_data["Products"]})
-        result_text = scrolledtext.ScrolledText(content_frame, height=15, font=("Roboto", 10), bg=self.colors["input_bg"])
+        def format_counts(counts, labels=None, limit=None):
+            ranked = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
+            return ", ".join(f"{labels[value] if labels else value} ({count})" for value, count in ranked)
+
+        def search():
+            try:
+                min_price = parse_price(min_price_entry)
+                max_price = parse_price(max_price_entry)
+                if min_price is not None and max_price is not None and min_price > max_price:
+                    raise ValueError("Minimum price cannot exceed maximum price")
+                sizes = [int(size) if size.isdigit() else size for size in split_list(sizes_entry)]
+                category = category_var.get()
+
+                result = self.catalog.facet_search(
+                    name_entry.get(),
+                    categories=[] if category == "Any" else [category],
+                    sizes=sizes,
+                    in_stock=in_stock_var.get(),
+                    shop_names=split_list(shops_entry),
+                    min_price=min_price,
+                    max_price=max_price
+                )
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid input: {e}")
+                return
+
+            if not result.total:
+                renderer.render(["No products match these filters."])
+                return
+
+            def blocks():
+                shown = f" (showing the first {len(result.matches)})" if len(result.matches) < result.total else ""
+                yield (f"{result.total} products match{shown}\n\n"
+                       f"Category: {format_counts(result.counts['category'])}\n"
+                       f"Sizes: {format_counts(result.counts['size'])}\n"
+                       "Availability: "
+                       f"{format_counts(result.counts['in_stock'], {True: 'In stock', False: 'Out of stock'})}\n"
+                       f"Top shops: {format_counts(result.counts['shop'], limit=10)}\n" + "=" * 50)
+                for shop, brand, brand_data in result.matches:
+                    yield (f"Shop: {shop}\nBrand: {brand}\nStock: {brand_data['stock']}\n"
+                           f"Price: ₹{brand_data['Price']}\nSizes: {brand_data['Sizes']}\n"
+                           f"Category: {brand_data.get('Category', 'Uncategorized')}\n" + "-" * 50)
+
+            renderer.render(blocks())
+
+        self.create_button(content_frame, "Search", search)
         result_text.pack(pady=10, fill="both", expand=True, padx=20)
 
-        result_text.insert(tk.END, "Available Brands:\n\n")
-        for brand in brands:
-            result_text.insert(tk.END, f"• {brand}\n")
+        entries = [name_entry, sizes_entry, shops_entry, min_price_entry, max_price_entry]
+        for entry, next_entry in zip(entries, entries[1:]):
+            entry.bind('<Return>', lambda e, next_entry=next_entry: next_entry.focus_set())
+        max_price_entry.bind('<Return>', lambda e: search())
 
-        self.set_back_button(self.admin_panel if self.scrollable_frame.winfo_children()[0].winfo_children()[0].cget("text") == "Admin Panel" else self.user_panel, show=True)
+        self.set_back_button(self.user_panel, show=True)
+
+        def refresh():
+            category_box.config(values=["Any"] + sorted(self.catalog.facet_search(limit=0).counts["category"]))
+
+        refresh()
+        return refresh
 
-    def shop_details(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen
+    def display_brands(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
+        content_frame.pack(pady=20, padx=50, fill="both", expand=True)
+
+        ttk.Label(content_frame, text="Available Brands", style="Subtitle.TLabel").pack(pady=(20, 10))
+
+        count_label = ttk.Label(content_frame, text="")
+        count_label.pack(anchor="w", padx=20, pady=(10, 0))
+        result_list = ResultList(content_frame, [
+            Column("Brand", 300, lambda item: item[0]),
+            Column("Shops", 100, lambda item: item[1]),
+        ], self.colors)
+        result_list.pack(pady=10, fill="both", expand=True, padx=20)
+
+        def refresh():
+            brand_counts = self.catalog.brand_counts()
+            count_label.config(text=f"{len(brand_counts)} brands")
+            result_list.set_rows(sorted(brand_counts.items()))
+            self.back_to_panel()
+
+        refresh()
+        return refresh
+
+    @screen
+    def shop_details(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Shop Details", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -1059,33 +1340,38 @@ class ShopEaseUI:
         result_text.pack(pady=10, fill="both", expand=True, padx=20)
 
         def get_shop_suggestions(query: str) -> List[str]:
-            query = query.lower()
-            return sorted([
-                shop for shop in self.data_handler.shops.keys()
-                if query in shop.lower()
-            ])
+            return self.catalog.complete_shops(query)
 
-        def update_suggestions(*args):
-            query = shop_name_entry.get().strip()
-            suggestions = get_shop_suggestions(query)
-            
+        def show_suggestions(suggestions):
             suggestion_listbox.delete(0, tk.END)
-            if suggestions and query:
+            if suggestions:
                 for suggestion in suggestions:
                     suggestion_listbox.insert(tk.END, suggestion)
                 suggestion_listbox.pack(pady=2, padx=20, fill="x")
             else:
                 suggestion_listbox.pack_forget()
 
+        def update_suggestions(event=None):
+            if event is not None and event.keysym in ("Escape", "Return"):
+                return
+            query = shop_name_entry.get().strip()
+            if query:
+                suggestion_query.submit(query)
+            else:
+                suggestion_query.cancel()
+                show_suggestions([])
+
         def on_select(event):
             if suggestion_listbox.curselection():
                 selected = suggestion_listbox.get(suggestion_listbox.curselection())
+                suggestion_query.cancel()
                 shop_name_entry.delete(0, tk.END)
                 shop_name_entry.insert(0, selected)
                 suggestion_listbox.pack_forget()
                 search()
 
         def on_escape(event):
+            suggestion_query.cancel()
             suggestion_listbox.pack_forget()
 
         suggestion_listbox = tk.Listbox(
@@ -1095,34 +1381,48 @@ class ShopEaseUI:
             bg=self.colors["input_bg"],
             selectmode=tk.SINGLE
         )
+        suggestion_query = AsyncQuery(self.root, self.query_executor, get_shop_suggestions, show_suggestions,
+                                      SUGGESTION_DEBOUNCE_MS, SUGGESTION_POLL_MS, suggestion_listbox.winfo_exists)
 
         shop_name_entry.bind('<KeyRelease>', update_suggestions)
         suggestion_listbox.bind('<<ListboxSelect>>', on_select)
         shop_name_entry.bind('<Escape>', on_escape)
 
+        last_search = {"generation": None, "name": None}
+
         def search():
-            shop_name = shop_name_entry.get().strip()
-            if shop_name in self.data_handler.shops:
-                shop_data = self.data_handler.shops[shop_name]
-                product_count = len(shop_data["Products"])
-                product_names = ", ".join(shop_data["Products"].keys())
+            show_results(shop_name_entry.get().strip())
 
+        def show_results(shop_name):
+            last_search.update(generation=self.catalog.generation, name=shop_name)
+            details = self.catalog.shop_details(shop_name)
+            if details is not None:
                 result_text.delete(1.0, tk.END)
                 result_text.insert(tk.END, f"Shop: {shop_name}\n")
-                result_text.insert(tk.END, f"Location: {shop_data['Location']}\n")
-                result_text.insert(tk.END, f"Product Count: {product_count}\n")
-                result_text.insert(tk.END, f"Products: {product_names}\n")
+                result_text.insert(tk.END, f"Location: {details['Location']}\n")
+                result_text.insert(tk.END, f"Product Count: {len(details['Products'])}\n")
+                result_text.insert(tk.END, f"Products: {', '.join(details['Products'])}\n")
             else:
                 result_text.delete(1.0, tk.END)
                 result_text.insert(tk.END, f"Shop '{shop_name}' not found.")
+                close_matches = [name for name, _ in self.catalog.fuzzy_shop_names(shop_name, 5)]
+                if close_matches:
+                    result_text.insert(tk.END, f"\nDid you mean: {', '.join(close_matches)}?")
 
         shop_name_entry.bind('<Return>', lambda e: search())
 
-        self.set_back_button(self.admin_panel if self.scrollable_frame.winfo_children()[0].winfo_children()[0].cget("text") == "Admin Panel" else self.user_panel, show=True)
+        def refresh():
+            # Redo the last search if the catalog has changed since
+            if last_search["generation"] not in (None, self.catalog.generation):
+                show_results(last_search["name"])
+            self.back_to_panel()
+
+        refresh()
+        return refresh
 
-    def contact_info(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen
+    def contact_info(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="Contact Information", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -1145,9 +1445,9 @@ class ShopEaseUI:
         contact_text.config(state="disabled")
         self.set_back_button(self.create_main_menu, show=True)
 
-    def user_profile_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen(cache=False)
+    def user_profile_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
         ttk.Label(content_frame, text="User Profile", style="Subtitle.TLabel").pack(pady=(20, 10))
@@ -1174,30 +1474,127 @@ class ShopEaseUI:
 
         self.set_back_button(self.user_panel, show=True)
 
-    def export_inventory_window(self):
-        self.clear_frame()
-        content_frame = ttk.Frame(self.scrollable_frame, style="Card.TFrame")
+    @screen(cache=False)
+    def import_inventory_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
         content_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
-        ttk.Label(content_frame, text="Export Inventory", style="Subtitle.TLabel").pack(pady=(20, 10))
+        ttk.Label(content_frame, text="Import Inventory", style="Subtitle.TLabel").pack(pady=(20, 10))
+        from .importer import INVENTORY_COLUMNS
+        ttk.Label(content_frame, text="Columns: " + ", ".join(INVENTORY_COLUMNS)).pack(anchor="w", padx=20)
 
         ttk.Label(content_frame, text="Shop Name:").pack(anchor="w", padx=20)
         shop_name_entry = self.create_entry(content_frame)
 
-        ttk.Label(content_frame, text="Output File (e.g., inventory.csv):").pack(anchor="w", padx=20)
+        ttk.Label(content_frame, text="Input File (e.g., inventory.csv):").pack(anchor="w", padx=20)
         file_entry = self.create_entry(content_frame)
 
-        def export():
+        status_label = ttk.Label(content_frame, text="")
+        status_label.pack(anchor="w", padx=20)
+
+        def show_result(shop_name, filename, result):
+            import_button.config(state="normal")
+            if result is None:
+                messagebox.showerror("Error", f"Failed to import {filename}. Check the file name.")
+                return
+            summary = (f"Imported {result.imported} products into {shop_name} "
+                       f"({result.added} added, {result.updated} updated).")
+            if result.error_count:
+                lines = [f"Line {line_number}: {message}" for line_number, message in result.errors[:10]]
+                if result.error_count > len(lines):
+                    lines.append(f"... and {result.error_count - len(lines)} more")
+                messagebox.showwarning("Import finished with errors",
+                                       f"{summary}\n\n{result.error_count} rows rejected:\n" + "\n".join(lines))
+            else:
+                messagebox.showinfo("Success", summary)
+            self.admin_panel()
+
+        def start_import():
+            if import_button.instate(["disabled"]):
+                return
             shop_name = shop_name_entry.get().strip()
             filename = file_entry.get().strip()
-            if not filename.endswith(".csv"):
-                filename += ".csv"
-            if self.data_handler.export_inventory(shop_name, filename):
-                messagebox.showinfo("Success", f"Inventory exported to {filename}")
-            else:
-                messagebox.showerror("Error", "Failed to export inventory. Check shop name.")
+            if shop_name not in self.data_handler.shops:
+                messagebox.showerror("Error", "Shop not found!")
+                return
+            if not filename:
+                messagebox.showerror("Error", "Please enter a file name.")
+                return
+            import_button.config(state="disabled")
+            # Large files are read on a worker thread so the window stays responsive
+            self.run_in_background(
+                lambda report: self.data_handler.import_inventory(
+                    shop_name, filename, lambda rows: report(f"Importing... {rows} rows read")),
+                status_label,
+                lambda result: show_result(shop_name, filename, result))
+
+        def on_shop_name_enter(event):
+            file_entry.focus_set()
+
+        def on_file_enter(event):
+            start_import()
+
+        shop_name_entry.bind('<Return>', on_shop_name_enter)
+        file_entry.bind('<Return>', on_file_enter)
+
+        button_frame = ttk.Frame(content_frame)
+        button_frame.pack(pady=20, fill="x")
+        import_button = self.create_button(button_frame, "Import", start_import, width=15)
+        self.set_back_button(self.admin_panel, show=True)
+
+    @screen(cache=False)
+    def export_inventory_window(self, frame):
+        content_frame = ttk.Frame(frame, style="Card.TFrame")
+        content_frame.pack(pady=20, padx=50, fill="both", expand=True)
+
+        ttk.Label(content_frame, text="Export Inventory", style="Subtitle.TLabel").pack(pady=(20, 10))
+
+        ttk.Label(content_frame, text="Shop Names (comma-separated, blank for all shops):").pack(anchor="w", padx=20)
+        shop_name_entry = self.create_entry(content_frame)
+
+        ttk.Label(content_frame, text="Output File (e.g., inventory.csv):").pack(anchor="w", padx=20)
+        file_entry = self.create_entry(content_frame)
+
+        ttk.Label(content_frame, text="Format:").pack(anchor="w", padx=20)
+        formats = {"CSV": ".csv", "JSON Lines": ".jsonl", "CSV (gzip)": ".csv.gz", "JSON Lines (gzip)": ".jsonl.gz"}
+        format_var = tk.StringVar(value="CSV")
+        ttk.Combobox(content_frame, textvariable=format_var, values=list(formats),
+                     state="readonly").pack(pady=8, padx=20, fill="x")
+
+        status_label = ttk.Label(content_frame, text="")
+        status_label.pack(anchor="w", padx=20)
+
+        def show_result(filename, rows):
+            export_button.config(state="normal")
+            if rows is None:
+                messagebox.showerror("Error", "Failed to export inventory. Check the file name.")
+                return
+            messagebox.showinfo("Success", f"Exported {rows} products to {filename}")
             self.admin_panel()
 
+        def export():
+            if export_button.instate(["disabled"]):
+                return
+            shop_names = [name.strip() for name in shop_name_entry.get().split(",") if name.strip()]
+            unknown = [name for name in shop_names if name not in self.data_handler.shops]
+            if unknown:
+                messagebox.showerror("Error", f"Shop not found: {', '.join(unknown)}")
+                return
+            filename = file_entry.get().strip()
+            if not filename:
+                messagebox.showerror("Error", "Please enter a file name.")
+                return
+            # A name that already has an export extension picks its own format, as export_format reads it
+            if not filename.lower().endswith(tuple(formats.values()) + (".json",)):
+                filename += formats[format_var.get()]
+            export_button.config(state="disabled")
+            self.run_in_background(
+                lambda report: self.data_handler.export_catalog(
+                    filename, shop_names or None,
+                    lambda done, total, rows: report(f"Exporting... {done}/{total} shops, {rows} products")),
+                status_label,
+                lambda rows: show_result(filename, rows))
+
         def on_shop_name_enter(event):
             file_entry.focus_set()
 
@@ -1207,4 +1604,7 @@ class ShopEaseUI:
         shop_name_entry.bind('<Return>', on_shop_name_enter)
         file_entry.bind('<Return>', on_file_enter)
 
+        button_frame = ttk.Frame(content_frame)
+        button_frame.pack(pady=20, fill="x")
+        export_button = self.create_button(button_frame, "Export", export, width=15)
         self.set_back_button(self.admin_panel, show=True)
\ No newline at end of file
@@ -0,0 +1,113 @@
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+
+class BackgroundWriter:
+    """Runs save jobs on a worker thread, coalescing repeated requests for the same key.
+
+    A job submitted under a key that is already queued replaces the queued job,
+    so a burst of saves within the coalescing window results in a single write.
+    Jobs submitted with key None are never coalesced and run in submission order.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self.pending: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.cond = threading.Condition()
+        self.busy = False
+        self.flushing = 0
+        self.closed = False
+        self.sequence = itertools.count()
+
+        self.writes = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.max_queue_depth = 0
+
+        self.thread = threading.Thread(target=self._run, name="shopease-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, key: Optional[Hashable], job: Callable[[], None]):
+        """Queue a job, replacing any queued job with the same key."""
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("BackgroundWriter is closed")
+            if key is None:
+                key = ("job", next(self.sequence))
+            if key in self.pending:
+                self.pending[key] = (job, self.pending[key][1])
+                self.coalesced += 1
+            else:
+                self.pending[key] = (job, time.monotonic())
+                self.max_queue_depth = max(self.max_queue_depth, len(self.pending))
+            self.cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                deadline = next(iter(self.pending.values()))[1] + self.window
+                while not (self.flushing or self.closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                batch = list(self.pending.values())
+                self.pending.clear()
+                self.busy = True
+
+            for job, submitted in batch:
+                try:
+                    job()
+                except Exception:
+                    self.failures += 1
+                    logging.exception("Background save failed")
+                latency = time.monotonic() - submitted
+                self.writes += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+                logging.debug(f"Background save finished in {latency * 1000:.1f} ms")
+
+            with self.cond:
+                self.busy = False
+                self.cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Run all queued jobs now and wait for them; returns False on timeout."""
+        with self.cond:
+            self.flushing += 1
+            self.cond.notify_all()
+            try:
+                return self.cond.wait_for(lambda: not self.pending and not self.busy, timeout)
+            finally:
+                self.flushing -= 1
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush outstanding jobs and stop the worker thread."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join(timeout)
+
+    def stats(self) -> Dict:
+        """Return queue depth, write counts and request-to-write latency."""
+        with self.cond:
+            queue_depth = len(self.pending)
+        return {
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "avg_latency_ms": round(self.total_latency / self.writes * 1000, 1) if self.writes else 0.0,
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+        }